@@ -0,0 +1,43 @@
+"""Аутентификация по токену с кешем в памяти процесса."""
+import copy
+
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import LRUCache
+from .constans import TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+
+
+class TokenCache(LRUCache):
+    """
+        LRU-кеш токен -> пользователь на TOKEN_CACHE_TTL секунд.
+        Сохранение или удаление пользователя и удаление токена
+        очищают записи после фиксации транзакции, но только в своем
+        процессе: в других процессах, как и после QuerySet.update(),
+        изменения вступают в силу не позже TTL.
+    """
+
+    def __init__(self, ttl=TOKEN_CACHE_TTL, size=TOKEN_CACHE_SIZE):
+        super().__init__('token', size, ttl)
+
+    def delete_user(self, user_id):
+        self.delete_where(lambda user: user.pk == user_id)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+        TokenAuthentication, которая для известных токенов
+        не обращается к базе данных.
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user)
+            return copy.copy(user), token
+        # Копия: изменения атрибутов в запросе не попадают в кеш.
+        user = copy.copy(user)
+        return user, self.get_model()(key=key, user=user)
@@ -0,0 +1,118 @@
+"""Кеши представлений рецептов и словарей в памяти процесса."""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .constans import (
+    RECIPE_CACHE_KEY_PREFIX,
+    RECIPE_CACHE_TIMEOUT,
+    SHORT_LINK_CACHE_SIZE
+)
+from .metrics import record_cache
+
+
+class RecipeRepresentationCache:
+    """
+        Хранит представление рецепта без отметок пользователя
+        и с относительными ссылками на файлы.
+        Бэкенд задается настройкой RECIPE_CACHE_ALIAS.
+    """
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RECIPE_CACHE_ALIAS', 'default')]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'RECIPE_CACHE_TIMEOUT', RECIPE_CACHE_TIMEOUT)
+
+    @staticmethod
+    def key(pk):
+        return f'{RECIPE_CACHE_KEY_PREFIX}:{pk}'
+
+    def get_many(self, pks):
+        keys = {self.key(pk): pk for pk in pks}
+        found = {
+            keys[key]: value
+            for key, value in self.cache.get_many(keys).items()
+        }
+        record_cache('recipe', len(found), len(keys) - len(found))
+        return found
+
+    def set_many(self, representations):
+        self.cache.set_many(
+            {
+                self.key(pk): representation
+                for pk, representation in representations.items()
+            },
+            self.timeout
+        )
+
+    def delete_many(self, pks):
+        self.cache.delete_many([self.key(pk) for pk in pks])
+
+
+recipe_cache = RecipeRepresentationCache()
+
+
+class LRUCache:
+    """
+        Потокобезопасный LRU-кеш в памяти процесса.
+        Если задан ttl, записи живут не дольше ttl секунд.
+        Попадания учитываются в метриках под именем name.
+    """
+
+    def __init__(self, name, size, ttl=None):
+        self.name = name
+        self.size = size
+        self.ttl = ttl
+        self.lock = Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is not None and expires < time.monotonic():
+                    del self.entries[key]
+                    entry = None
+                else:
+                    self.entries.move_to_end(key)
+        if entry is None:
+            record_cache(self.name, misses=1)
+            return None
+        record_cache(self.name, hits=1)
+        return value
+
+    def set(self, key, value):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def delete_where(self, predicate):
+        with self.lock:
+            for key in [
+                key for key, (value, _) in self.entries.items()
+                if predicate(value)
+            ]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# Код короткой ссылки -> id рецепта. Коды не меняются,
+# поэтому записи удаляются только вместе с рецептом.
+short_link_cache = LRUCache('short_link', SHORT_LINK_CACHE_SIZE)
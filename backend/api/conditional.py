@@ -0,0 +1,59 @@
+"""Условные GET-запросы по номерам изменений данных."""
+from functools import wraps
+
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from recipes.versions import get_versions
+from .metrics import record_cache
+
+
+def conditional(*names, personal=False):
+    """
+        Декоратор метода представления: отдает ETag и Last-Modified
+        по номерам изменений данных names и отвечает 304 без сериализации.
+        Для ответов с отметками пользователя в ETag добавляется
+        его id, а Last-Modified не отдается.
+    """
+
+    def versions(request):
+        if not hasattr(request, 'data_versions'):
+            request.data_versions = get_versions(*names)
+        return request.data_versions
+
+    def etag(request, *args, **kwargs):
+        parts = [str(version) for version, _ in versions(request)]
+        if personal:
+            parts.append(str(request.user.pk or 0))
+        return '-'.join(parts)
+
+    def last_modified(request, *args, **kwargs):
+        updated = [
+            updated_at for _, updated_at in versions(request) if updated_at
+        ]
+        return max(updated) if updated else None
+
+    def decorator(method):
+        conditional_method = condition(
+            etag_func=etag,
+            last_modified_func=None if personal else last_modified
+        )
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            response = conditional_method(
+                lambda request, *args, **kwargs: method(
+                    self, request, *args, **kwargs
+                )
+            )(request, *args, **kwargs)
+            if response.status_code == 304:
+                record_cache('conditional', hits=1)
+            else:
+                record_cache('conditional', misses=1)
+            if personal:
+                patch_vary_headers(response, ('Authorization',))
+            return response
+
+        return wrapper
+
+    return decorator
@@ -1,3 +1,36 @@
 PAGE_SIZE = 10
+CURSOR_PAGINATION_VALUE = 'cursor'
 MIN_INGREDIENT_AMOUNT = 1
 MIN_RECIPE_COOKING_TIME = 1
+SHOPPING_LIST_TITLE = 'Список покупок:'
+SHOPPING_LIST_FILENAME = 'shopping_list'
+SHOPPING_LIST_FORMATS = ('txt', 'csv', 'pdf')
+SHOPPING_LIST_PDF_FONT = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+SHOPPING_LIST_PDF_FONT_SIZE = 12
+SHOPPING_LIST_PDF_MARGIN = 50
+SHOPPING_LIST_PDF_LINE_HEIGHT = 18
+INDEX_TTL = 300
+INGREDIENT_SEARCH_LIMIT = 20
+INGREDIENT_SEARCH_MAX_LIMIT = 100
+INGREDIENT_NGRAM_SIZE = 3
+UPLOAD_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+UPLOAD_IMAGE_MAX_PIXELS = 40_000_000
+UPLOAD_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+UPLOAD_SPOOL_MAX_MEMORY = 1024 * 1024
+BASE64_CHUNK_SIZE = 64 * 1024
+RECIPE_CACHE_TIMEOUT = 300
+RECIPE_CACHE_KEY_PREFIX = 'recipe-representation'
+BATCH_MAX_IDS = 100
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_SIZE = 10000
+RECIPE_SEARCH_MAX_RESULTS = 1000
+PANTRY_MAX_MISSING = 2
+PANTRY_MAX_MISSING_LIMIT = 10
+PANTRY_MAX_INGREDIENTS = 200
+SHORT_LINK_CACHE_SIZE = 100000
+METRICS_PREFIX = 'foodgram'
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+METRICS_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+METRICS_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
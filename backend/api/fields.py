@@ -0,0 +1,141 @@
+import base64
+import binascii
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+from recipes.constans import IMAGE_VARIANTS
+from .constans import (
+    BASE64_CHUNK_SIZE,
+    UPLOAD_IMAGE_FORMATS,
+    UPLOAD_IMAGE_MAX_BYTES,
+    UPLOAD_IMAGE_MAX_PIXELS,
+    UPLOAD_SPOOL_MAX_MEMORY
+)
+
+
+class StreamingBase64ImageField(serializers.ImageField):
+    """
+        Изображение в виде data:image/...;base64,...
+        Строка декодируется частями во временный файл, который
+        уходит на диск после UPLOAD_SPOOL_MAX_MEMORY байт.
+        Ограничения по размеру проверяются до конца декодирования,
+        изображение проверяется только по заголовку.
+    """
+    default_error_messages = {
+        'invalid': 'Некорректный формат изображения',
+        'too_large': 'Размер изображения превышает {max_bytes} байт.',
+        'too_many_pixels': (
+            'Разрешение изображения превышает {max_pixels} пикселей.'
+        ),
+    }
+
+    def __init__(self, file_name=None, **kwargs):
+        self.file_name = file_name
+        super().__init__(**kwargs)
+
+    @property
+    def max_bytes(self):
+        return getattr(
+            settings, 'UPLOAD_IMAGE_MAX_BYTES', UPLOAD_IMAGE_MAX_BYTES
+        )
+
+    @property
+    def max_pixels(self):
+        return getattr(
+            settings, 'UPLOAD_IMAGE_MAX_PIXELS', UPLOAD_IMAGE_MAX_PIXELS
+        )
+
+    def to_internal_value(self, data):
+        if not data:
+            self.fail('required')
+        if not isinstance(data, str) or ';base64,' not in data:
+            self.fail('invalid')
+
+        offset = data.index(';base64,') + len(';base64,')
+        if (len(data) - offset) // 4 * 3 > self.max_bytes + 2:
+            self.fail('too_large', max_bytes=self.max_bytes)
+
+        file = tempfile.SpooledTemporaryFile(
+            max_size=UPLOAD_SPOOL_MAX_MEMORY
+        )
+        try:
+            size = self.decode(data, offset, file)
+            image_format = self.check_image(file)
+        except serializers.ValidationError:
+            file.close()
+            raise
+
+        file.seek(0)
+        extension = image_format.lower()
+        return UploadedFile(
+            file=file,
+            name=f'{self.file_name or uuid.uuid4()}.{extension}',
+            content_type=Image.MIME[image_format],
+            size=size
+        )
+
+    def decode(self, data, offset, file):
+        size = 0
+        for start in range(offset, len(data), BASE64_CHUNK_SIZE):
+            try:
+                chunk = base64.b64decode(
+                    data[start:start + BASE64_CHUNK_SIZE], validate=True
+                )
+            except (binascii.Error, ValueError):
+                self.fail('invalid')
+            size += len(chunk)
+            if size > self.max_bytes:
+                self.fail('too_large', max_bytes=self.max_bytes)
+            file.write(chunk)
+        return size
+
+    def check_image(self, file):
+        file.seek(0)
+        try:
+            with Image.open(file) as image:
+                image_format = image.format
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.fail('too_many_pixels', max_pixels=self.max_pixels)
+        except (OSError, SyntaxError, ValueError):
+            self.fail('invalid')
+
+        if image_format not in UPLOAD_IMAGE_FORMATS:
+            self.fail('invalid')
+        if width * height > self.max_pixels:
+            self.fail('too_many_pixels', max_pixels=self.max_pixels)
+        return image_format
+
+
+class ImageVariantsField(serializers.Field):
+    """
+        Ссылки на уменьшенные копии изображения.
+        Пока копии не готовы, отдается ссылка на оригинал.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        image = getattr(instance, self.image_field)
+        if not image:
+            return {}
+
+        variants = getattr(instance, f'{self.image_field}_variants')
+        ready = variants.get('source') == image.name
+        request = self.context.get('request')
+        urls = {}
+        for variant in IMAGE_VARIANTS:
+            url = image.storage.url(variants[variant]) if ready else image.url
+            urls[variant] = (
+                request.build_absolute_uri(url) if request else url
+            )
+        return urls
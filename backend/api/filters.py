@@ -1,8 +1,12 @@
+from django.db import connection
+from django.db.models import Case, IntegerField, When
 from django_filters import rest_framework as rf_filters
 
 from recipes.models import (
     Recipe,
 )
+from .constans import RECIPE_SEARCH_MAX_RESULTS
+from .indexes import recipe_search_index
 
 
 class RecipeFilter(rf_filters.FilterSet):
@@ -10,6 +14,14 @@ class RecipeFilter(rf_filters.FilterSet):
         method='filter_shopping_cart'
     )
     is_favorited = rf_filters.BooleanFilter(method='filter_favorited')
+    search = rf_filters.CharFilter(method='filter_search')
+    ordering = rf_filters.ChoiceFilter(
+        choices=(
+            ('popular', 'Популярные'),
+            ('trending', 'Популярные за последнее время'),
+        ),
+        method='filter_ordering'
+    )
 
     class Meta:
         model = Recipe
@@ -17,10 +29,38 @@ class RecipeFilter(rf_filters.FilterSet):
 
     def filter_shopping_cart(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
-            return queryset.filter(shopping_cart__author=self.request.user)
+            return queryset.filter(is_in_shopping_cart=True)
         return queryset
 
     def filter_favorited(self, queryset, name, value):
         if value and self.request.user.is_authenticated:
-            return queryset.filter(favorite__author=self.request.user)
+            return queryset.filter(is_favorited=True)
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск с сортировкой по релевантности."""
+        if not value.strip():
+            return queryset
+        if connection.vendor == 'postgresql':
+            return queryset.search(value)
+
+        recipe_ids = recipe_search_index.search(
+            value, RECIPE_SEARCH_MAX_RESULTS
+        )
+        if not recipe_ids:
+            return queryset.none()
+        return queryset.filter(pk__in=recipe_ids).order_by(Case(
+            *(
+                When(pk=recipe_id, then=position)
+                for position, recipe_id in enumerate(recipe_ids)
+            ),
+            output_field=IntegerField()
+        ))
+
+    def filter_ordering(self, queryset, name, value):
+        """Сортировка по индексированным столбцам популярности."""
+        if value == 'popular':
+            return queryset.order_by('-favorites_count', '-id')
+        if value == 'trending':
+            return queryset.order_by('-trending_score', '-id')
         return queryset
@@ -0,0 +1,338 @@
+"""Индексы в памяти процесса для быстрого поиска."""
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+
+from django.db import transaction
+
+from recipes.models import Ingredient, Recipe, RecipeIngredient
+from .constans import INDEX_TTL, INGREDIENT_NGRAM_SIZE
+
+
+class InMemoryIndex:
+    """
+        Базовый индекс в памяти процесса.
+        Строится при первом обращении и перестраивается после
+        сброса (сигналы моделей) или по истечении ttl, чтобы
+        подхватить изменения, сделанные другими процессами.
+    """
+    ttl = INDEX_TTL
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (данные, время построения) меняются одним присваиванием,
+        # чтобы читатели без блокировки видели согласованную пару.
+        self._snapshot = None
+        self._generation = 0
+
+    def build(self):
+        raise NotImplementedError
+
+    def invalidate(self, *args, **kwargs):
+        self._generation += 1
+        self._snapshot = None
+
+    def is_fresh(self, snapshot):
+        return (
+            snapshot is not None
+            and time.monotonic() - snapshot[1] < self.ttl
+        )
+
+    @property
+    def data(self):
+        snapshot = self._snapshot
+        if self.is_fresh(snapshot):
+            return snapshot[0]
+        with self._lock:
+            snapshot = self._snapshot
+            if self.is_fresh(snapshot):
+                return snapshot[0]
+            generation = self._generation
+            data = self.build()
+            if generation == self._generation:
+                self._snapshot = (data, time.monotonic())
+            return data
+
+
+def ngrams(value, size=INGREDIENT_NGRAM_SIZE):
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+class IngredientIndex(InMemoryIndex):
+    """
+        Автодополнение ингредиентов.
+        Сначала идут совпадения по началу названия (бинарный поиск
+        по отсортированным названиям), затем по подстроке
+        (проверяются только названия из самого короткого
+        списка триграмм запроса, а для запросов короче
+        триграммы все названия).
+    """
+
+    def build(self):
+        rows = sorted(
+            Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            ).iterator(),
+            key=lambda row: (row[1].casefold(), row[0])
+        )
+        keys = [row[1].casefold() for row in rows]
+        postings = {}
+        for position, key in enumerate(keys):
+            for gram in ngrams(key):
+                postings.setdefault(gram, array('I')).append(position)
+        return rows, keys, postings
+
+    def prefix_positions(self, keys, query):
+        position = bisect.bisect_left(keys, query)
+        while position < len(keys) and keys[position].startswith(query):
+            yield position
+            position += 1
+
+    def substring_positions(self, keys, postings, query):
+        if not query:
+            return
+        grams = ngrams(query)
+        if grams:
+            positions = min(
+                (postings.get(gram, ()) for gram in grams), key=len
+            )
+        else:
+            positions = range(len(keys))
+        for position in positions:
+            key = keys[position]
+            if query in key and not key.startswith(query):
+                yield position
+
+    def search(self, query, limit):
+        rows, keys, postings = self.data
+        query = query.casefold()
+        result = []
+        for positions in (
+            self.prefix_positions(keys, query),
+            self.substring_positions(keys, postings, query)
+        ):
+            for position in positions:
+                if len(result) >= limit:
+                    return result
+                ingredient_id, name, measurement_unit = rows[position]
+                result.append({
+                    'id': ingredient_id,
+                    'name': name,
+                    'measurement_unit': measurement_unit
+                })
+        return result
+
+
+def words(value):
+    return re.findall(r'\w{2,}', value.casefold())
+
+
+class RecipeSearchIndex(InMemoryIndex):
+    """
+        Полнотекстовый поиск рецептов для баз без собственного
+        (SQLite в тестах). Слова запроса ищутся по началу слов
+        отсортированного словаря; у каждого слова есть список рецептов
+        и вес поля: название 3, ингредиенты 2, описание 1.
+    """
+    NAME_WEIGHT = 3
+    INGREDIENT_WEIGHT = 2
+    TEXT_WEIGHT = 1
+
+    def build(self):
+        weights = {}
+
+        def add(recipe_id, value, weight):
+            for word in words(value):
+                postings = weights.setdefault(word, {})
+                if postings.get(recipe_id, 0) < weight:
+                    postings[recipe_id] = weight
+
+        total = 0
+        for recipe_id, name, text in Recipe.objects.values_list(
+            'id', 'name', 'text'
+        ).iterator():
+            total += 1
+            add(recipe_id, name, self.NAME_WEIGHT)
+            add(recipe_id, text, self.TEXT_WEIGHT)
+        for recipe_id, name in RecipeIngredient.objects.values_list(
+            'recipe_id', 'ingredient__name'
+        ).iterator():
+            add(recipe_id, name, self.INGREDIENT_WEIGHT)
+
+        terms = sorted(weights)
+        postings = []
+        for term in terms:
+            by_weight = {}
+            for recipe_id, weight in weights.pop(term).items():
+                by_weight.setdefault(weight, array('I')).append(recipe_id)
+            postings.append(tuple(by_weight.items()))
+        return terms, postings, total
+
+    def word_scores(self, terms, postings, total, word):
+        """
+            Вес рецептов для слова запроса: лучшее совпадение среди слов
+            словаря, начинающихся с word. Списки применяются по
+            возрастанию веса, чтобы больший перезаписывал меньший.
+        """
+        chunks = []
+        position = bisect.bisect_left(terms, word)
+        while position < len(terms) and terms[position].startswith(word):
+            groups = postings[position]
+            idf = math.log(
+                1 + total / sum(len(recipe_ids) for _, recipe_ids in groups)
+            )
+            for weight, recipe_ids in groups:
+                chunks.append((weight * idf, recipe_ids))
+            position += 1
+        scores = {}
+        for score, recipe_ids in sorted(chunks, key=lambda chunk: chunk[0]):
+            scores.update(dict.fromkeys(recipe_ids, score))
+        return scores
+
+    def search(self, query, limit):
+        """Id рецептов, содержащих все слова запроса, по убыванию веса."""
+        terms, postings, total = self.data
+        scores = None
+        for word in set(words(query)):
+            word_scores = self.word_scores(terms, postings, total, word)
+            if scores is not None:
+                word_scores = {
+                    recipe_id: scores[recipe_id] + score
+                    for recipe_id, score in word_scores.items()
+                    if recipe_id in scores
+                }
+            scores = word_scores
+            if not scores:
+                return []
+        if scores is None:
+            return []
+        return heapq.nlargest(
+            limit, scores, key=lambda recipe_id: (scores[recipe_id], recipe_id)
+        )
+
+
+class PantryIndex(InMemoryIndex):
+    """
+        Подбор рецептов по имеющимся продуктам.
+        Для каждого ингредиента хранится отсортированный массив id
+        рецептов, для каждого рецепта - массив его ингредиентов.
+        Просматриваются только рецепты, где есть хотя бы один продукт.
+        Изменения рецептов применяются к копии индекса только для
+        затронутых рецептов, читатели продолжают работать со старой.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending = threading.local()
+
+    def schedule_update(self, *recipe_ids):
+        """Обновляет рецепты recipe_ids один раз после фиксации."""
+        if not hasattr(self._pending, 'recipe_ids'):
+            self._pending.recipe_ids = set()
+        self._pending.recipe_ids.update(recipe_ids)
+        transaction.on_commit(self.flush)
+
+    def flush(self):
+        recipe_ids = self._pending.recipe_ids
+        self._pending.recipe_ids = set()
+        if recipe_ids:
+            self.update(recipe_ids)
+
+    def update(self, recipe_ids):
+        # Под той же блокировкой, что и построение: обновление
+        # не потеряется, если индекс строится одновременно с ним.
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            (recipes_by_ingredient, ingredients_by_recipe), built_at = (
+                snapshot
+            )
+            current = {}
+            for recipe_id, ingredient_id in RecipeIngredient.objects.filter(
+                recipe_id__in=recipe_ids
+            ).values_list('recipe_id', 'ingredient_id').order_by(
+                'recipe_id', 'ingredient_id'
+            ):
+                current.setdefault(
+                    recipe_id, array('I')
+                ).append(ingredient_id)
+            recipes_by_ingredient = dict(recipes_by_ingredient)
+            ingredients_by_recipe = dict(ingredients_by_recipe)
+            touched = set()
+            for recipe_id in recipe_ids:
+                touched.update(ingredients_by_recipe.pop(recipe_id, ()))
+                if recipe_id in current:
+                    ingredients_by_recipe[recipe_id] = current[recipe_id]
+                    touched.update(current[recipe_id])
+            for ingredient_id in touched:
+                recipe_set = {
+                    recipe_id
+                    for recipe_id in recipes_by_ingredient.get(
+                        ingredient_id, ()
+                    )
+                    if recipe_id not in recipe_ids
+                }
+                recipe_set.update(
+                    recipe_id for recipe_id, ingredients in current.items()
+                    if ingredient_id in ingredients
+                )
+                if recipe_set:
+                    recipes_by_ingredient[ingredient_id] = array(
+                        'I', sorted(recipe_set)
+                    )
+                else:
+                    recipes_by_ingredient.pop(ingredient_id, None)
+            self._snapshot = (
+                (recipes_by_ingredient, ingredients_by_recipe), built_at
+            )
+
+    def build(self):
+        recipes_by_ingredient = {}
+        ingredients_by_recipe = {}
+        for ingredient_id, recipe_id in RecipeIngredient.objects.values_list(
+            'ingredient_id', 'recipe_id'
+        ).order_by('ingredient_id', 'recipe_id').iterator():
+            recipes_by_ingredient.setdefault(
+                ingredient_id, array('I')
+            ).append(recipe_id)
+            ingredients_by_recipe.setdefault(
+                recipe_id, array('I')
+            ).append(ingredient_id)
+        return recipes_by_ingredient, ingredients_by_recipe
+
+    def match(self, pantry, max_missing):
+        """
+            Возвращает id рецептов, где недостает не больше max_missing
+            продуктов: сначала те, что можно приготовить целиком.
+        """
+        recipes_by_ingredient, ingredients_by_recipe = self.data
+        found = Counter()
+        for ingredient_id in pantry:
+            found.update(recipes_by_ingredient.get(ingredient_id, ()))
+        ranked = []
+        for recipe_id, count in found.items():
+            missing = len(ingredients_by_recipe[recipe_id]) - count
+            if missing <= max_missing:
+                ranked.append((missing, -count, -recipe_id))
+        ranked.sort()
+        return [-recipe_id for _, _, recipe_id in ranked]
+
+    def missing(self, recipe_id, pantry):
+        """Id ингредиентов рецепта, которых нет среди продуктов."""
+        _, ingredients_by_recipe = self.data
+        return [
+            ingredient_id
+            for ingredient_id in ingredients_by_recipe.get(recipe_id, ())
+            if ingredient_id not in pantry
+        ]
+
+
+ingredient_index = IngredientIndex()
+recipe_search_index = RecipeSearchIndex()
+pantry_index = PantryIndex()
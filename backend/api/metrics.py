@@ -0,0 +1,231 @@
+"""Метрики запросов в формате Prometheus."""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+
+from django.db import connection
+from django.http import HttpResponse
+
+from .constans import (
+    METRICS_LATENCY_BUCKETS,
+    METRICS_PREFIX,
+    METRICS_QUERY_BUCKETS,
+    METRICS_SIZE_BUCKETS
+)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+NO_LABEL = '-'
+
+current_request = ContextVar('metrics_request', default=None)
+
+
+class Counter:
+
+    def __init__(self, name, description, labels):
+        self.name = f'{METRICS_PREFIX}_{name}'
+        self.description = description
+        self.labels = labels
+        self.values = {}
+
+    def add(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def lines(self):
+        yield f'# HELP {self.name} {self.description}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self.values.items()):
+            yield f'{self.name}{format_labels(self.labels, labels)} {value}'
+
+
+class Histogram(Counter):
+
+    def __init__(self, name, description, labels, buckets):
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+
+    def add(self, labels, amount=1):
+        # [количество по корзинам..., +Inf, сумма]
+        value = self.values.get(labels)
+        if value is None:
+            value = self.values[labels] = [0] * (len(self.buckets) + 2)
+        value[bisect_left(self.buckets, amount)] += 1
+        value[-1] += amount
+
+    def lines(self):
+        yield f'# HELP {self.name} {self.description}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, value in sorted(self.values.items()):
+            total = 0
+            for bound, count in zip(self.buckets + ('+Inf',), value):
+                total += count
+                yield '{}_bucket{} {}'.format(
+                    self.name,
+                    format_labels(
+                        self.labels + ('le',), labels + (str(bound),)
+                    ),
+                    total
+                )
+            suffix = format_labels(self.labels, labels)
+            yield f'{self.name}_sum{suffix} {value[-1]}'
+            yield f'{self.name}_count{suffix} {total}'
+
+
+def format_labels(names, values):
+    return '{%s}' % ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for name, value in zip(names, values)
+    )
+
+
+class Registry:
+    """
+        Метрики процесса. У каждого воркера свои значения,
+        Prometheus собирает их с каждого воркера отдельно.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        endpoint = ('view', 'action')
+        self.requests = Counter(
+            'http_requests_total',
+            'Количество запросов.',
+            endpoint + ('method', 'status')
+        )
+        self.latency = Histogram(
+            'http_request_duration_seconds',
+            'Время обработки запроса.',
+            endpoint, METRICS_LATENCY_BUCKETS
+        )
+        self.response_size = Histogram(
+            'http_response_size_bytes',
+            'Размер тела ответа.',
+            endpoint, METRICS_SIZE_BUCKETS
+        )
+        self.queries = Histogram(
+            'db_queries_per_request',
+            'Количество запросов к базе данных за запрос.',
+            endpoint, METRICS_QUERY_BUCKETS
+        )
+        self.query_time = Counter(
+            'db_query_duration_seconds_total',
+            'Время запросов к базе данных.',
+            endpoint
+        )
+        self.cache = Counter(
+            'cache_requests_total',
+            'Обращения к кешам.',
+            endpoint + ('cache', 'result')
+        )
+        self.metrics = (
+            self.requests,
+            self.latency,
+            self.response_size,
+            self.queries,
+            self.query_time,
+            self.cache
+        )
+
+    def observe(self, state, method, status, duration, size):
+        endpoint = (state.view, state.action)
+        with self.lock:
+            self.requests.add(endpoint + (method, str(status)))
+            self.latency.add(endpoint, duration)
+            if size is not None:
+                self.response_size.add(endpoint, size)
+            self.queries.add(endpoint, state.queries)
+            self.query_time.add(endpoint, state.query_time)
+            for (cache, result), amount in state.cache.items():
+                self.cache.add(endpoint + (cache, result), amount)
+
+    def observe_cache(self, cache, hits, misses):
+        with self.lock:
+            for result, amount in (('hit', hits), ('miss', misses)):
+                if amount:
+                    self.cache.add(
+                        (NO_LABEL, NO_LABEL, cache, result), amount
+                    )
+
+    def render(self):
+        with self.lock:
+            return '\n'.join(
+                line for metric in self.metrics for line in metric.lines()
+            ) + '\n'
+
+
+registry = Registry()
+
+
+class RequestState:
+    __slots__ = ('view', 'action', 'queries', 'query_time', 'cache')
+
+    def __init__(self):
+        self.view = NO_LABEL
+        self.action = NO_LABEL
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+
+def record_cache(cache, hits=0, misses=0):
+    """Учитывает попадания в кеш в метриках текущего запроса."""
+    state = current_request.get()
+    if state is None:
+        registry.observe_cache(cache, hits, misses)
+        return
+    for result, amount in (('hit', hits), ('miss', misses)):
+        if amount:
+            key = (cache, result)
+            state.cache[key] = state.cache.get(key, 0) + amount
+
+
+class MetricsMiddleware:
+    """
+        Время, запросы к базе данных, размер ответа и обращения
+        к кешам для каждого представления и действия DRF.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RequestState()
+        token = current_request.set(state)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(state):
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        duration = time.perf_counter() - start
+        registry.observe(
+            state,
+            request.method,
+            response.status_code,
+            duration,
+            None if response.streaming else len(response.content)
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = current_request.get()
+        view = getattr(view_func, 'cls', view_func)
+        state.view = getattr(view, '__name__', NO_LABEL)
+        actions = getattr(view_func, 'actions', None)
+        if actions:
+            state.action = actions.get(request.method.lower(), NO_LABEL)
+
+
+def metrics(request):
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
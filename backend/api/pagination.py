@@ -1,8 +1,65 @@
-from rest_framework.pagination import PageNumberPagination
-from .constans import PAGE_SIZE
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+from .constans import PAGE_SIZE, CURSOR_PAGINATION_VALUE
+
+
+class IdCursorPagination(CursorPagination):
+    """
+        Постраничный вывод по курсору.
+        Позиция курсора - первичный ключ, поэтому она однозначна
+        и страница не зависит от глубины; общее количество не считается.
+        Сортировки фильтров по неуникальным полям не поддерживаются.
+    """
+    page_size = PAGE_SIZE
+    page_size_query_param = 'limit'
+    max_page_size = PAGE_SIZE * 10
+    ordering = '-id'
+    unique_fields = ('id', 'pk')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = queryset.query.order_by
+        if not ordering:
+            return super().get_ordering(request, queryset, view)
+        field = ordering[0] if isinstance(ordering[0], str) else ''
+        if field.lstrip('-') not in self.unique_fields:
+            raise ValidationError({
+                'pagination': 'Курсор недоступен для этой сортировки.'
+            })
+        return (field,)
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = PAGE_SIZE
     page_size_query_param = 'limit'
     max_page_size = PAGE_SIZE * 10
+    pagination_query_param = 'pagination'
+    cursor_pagination_class = IdCursorPagination
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        """
+            Курсор включается параметром pagination=cursor.
+            Для списков без сортировки в базе cursor_pagination_class = None.
+        """
+        if self.cursor_pagination_class is None:
+            return False
+        return (
+            request.query_params.get(self.pagination_query_param)
+            == CURSOR_PAGINATION_VALUE
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
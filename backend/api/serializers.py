@@ -1,7 +1,8 @@
-import base64
+import copy
 
-from django.core.files.base import ContentFile
 from django.core.validators import RegexValidator
+from django.db import transaction
+from django.db.models import Manager
 from rest_framework.exceptions import ValidationError
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
@@ -13,20 +14,32 @@ from recipes.models import (
     RecipeIngredient,
     Recipe
 )
-from .constans import MIN_INGREDIENT_AMOUNT, MIN_RECIPE_COOKING_TIME
+from recipes.similarity import schedule_update as schedule_similar_update
+from .cache import recipe_cache
+from .constans import (
+    BATCH_MAX_IDS,
+    MIN_INGREDIENT_AMOUNT,
+    MIN_RECIPE_COOKING_TIME
+)
+from .fields import ImageVariantsField, StreamingBase64ImageField
 
 
 class ClientReadSerializer(serializers.ModelSerializer):
     is_subscribed = serializers.SerializerMethodField(read_only=True)
+    avatar_variants = ImageVariantsField('avatar')
 
     class Meta:
         model = Client
         fields = (
             'id', 'email', 'username', 'first_name',
-            'last_name', 'is_subscribed', 'avatar'
+            'last_name', 'is_subscribed', 'avatar', 'avatar_variants'
         )
 
     def get_is_subscribed(self, obj):
+        annotated = getattr(obj, 'is_subscribed', None)
+        if annotated is not None:
+            return annotated
+
         request = self.context.get('request')
 
         return (
@@ -71,34 +84,20 @@ class ClientWriteSerializer(serializers.ModelSerializer):
 
 
 class ClientAvatarSerializer(serializers.ModelSerializer):
-    avatar = serializers.CharField(
+    avatar = StreamingBase64ImageField(
+        file_name='user_avatar',
         write_only=True,
         required=True,
-        allow_null=False
+        allow_null=False,
+        error_messages={
+            'required': 'Поле avatar обязательно для заполнения.'
+        }
     )
 
     class Meta:
         model = Client
         fields = ['avatar']
 
-    def validate_avatar(self, value):
-        if not value:
-            raise serializers.ValidationError(
-                'Поле ''avatar'' обязательно для заполнения.'
-            )
-        try:
-            format, img_str = value.split(';base64,')
-            ext = format.split('/')[-1]
-            data = ContentFile(
-                base64.b64decode(img_str),
-                name=f'user_avatar.{ext}'
-            )
-        except Exception:
-            raise serializers.ValidationError(
-                'Некорректный формат изображения'
-            )
-        return data
-
     def update(self, instance, validated_data):
         if 'avatar' in validated_data:
             instance.avatar = validated_data['avatar']
@@ -107,10 +106,22 @@ class ClientAvatarSerializer(serializers.ModelSerializer):
                 'Поле ''avatar'' обязательно для обновления.'
             )
 
-        instance.save()
+        instance.save(update_fields=['avatar'])
         return instance
 
 
+class BatchIdsSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BATCH_MAX_IDS
+    )
+
+    def validate_ids(self, value):
+        """Убираем повторы, сохраняя порядок."""
+        return list(dict.fromkeys(value))
+
+
 class IngredientSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -145,10 +156,9 @@ class RecipeIngredientReadSerializer(serializers.ModelSerializer):
 
 
 class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(
-        queryset=Ingredient.objects.all(),
-        source='ingredient'
-    )
+    # Существование ингредиентов проверяется одним запросом
+    # в RecipeWriteSerializer.validate_ingredients.
+    id = serializers.IntegerField(source='ingredient')
 
     class Meta:
         model = RecipeIngredient
@@ -171,23 +181,75 @@ class RecipeIngredientWriteSerializer(serializers.ModelSerializer):
         ).data
 
 
-class RecipeReadSerializer(serializers.ModelSerializer):
+def get_base_representations(pks):
+    """
+        Возвращает общие части представлений рецептов pks: из кеша,
+        а недостающие загружает одним набором запросов и кеширует.
+    """
+    representations = recipe_cache.get_many(pks)
+    missing = [pk for pk in pks if pk not in representations]
+    if missing:
+        loaded = {
+            recipe.pk: RecipeBaseSerializer(recipe).data
+            for recipe in Recipe.objects.filter(
+                pk__in=missing
+            ).with_related()
+        }
+        recipe_cache.set_many(loaded)
+        representations.update(loaded)
+    return representations
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Собирает представления всех рецептов страницы разом."""
+
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        representations = get_base_representations(
+            [recipe.pk for recipe in recipes]
+        )
+        return [
+            self.child.personalize(representations[recipe.pk], recipe)
+            for recipe in recipes
+            if recipe.pk in representations
+        ]
+
+
+class RecipeBaseSerializer(serializers.ModelSerializer):
+    """Часть представления рецепта, одинаковая для всех пользователей."""
     author = ClientReadSerializer(read_only=True)
     ingredients = RecipeIngredientReadSerializer(
         many=True,
         source='recipe_ingredients'
     )
-    is_favorited = serializers.SerializerMethodField(read_only=True)
-    is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    image_variants = ImageVariantsField('image')
 
     class Meta:
         model = Recipe
         fields = (
-            'id', 'name', 'image', 'ingredients', 'is_favorited',
-            'text', 'cooking_time', 'author', 'is_in_shopping_cart'
+            'id', 'name', 'image', 'image_variants', 'ingredients',
+            'text', 'cooking_time', 'author'
         )
 
+
+class RecipeReadSerializer(RecipeBaseSerializer):
+    is_favorited = serializers.SerializerMethodField(read_only=True)
+    is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+    favorites_count = serializers.IntegerField(read_only=True)
+
+    class Meta(RecipeBaseSerializer.Meta):
+        fields = (
+            'id', 'name', 'image', 'image_variants', 'ingredients',
+            'is_favorited', 'text', 'cooking_time', 'author',
+            'is_in_shopping_cart', 'favorites_count'
+        )
+        list_serializer_class = RecipeListSerializer
+
     def get_is_in_shopping_cart(self, obj):
+        annotated = getattr(obj, 'is_in_shopping_cart', None)
+        if annotated is not None:
+            return annotated
+
         request = self.context.get('request')
 
         if request.user.is_authenticated:
@@ -196,6 +258,10 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             return False
 
     def get_is_favorited(self, obj):
+        annotated = getattr(obj, 'is_favorited', None)
+        if annotated is not None:
+            return annotated
+
         request = self.context.get('request')
 
         if request.user.is_authenticated:
@@ -203,19 +269,47 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         else:
             return False
 
-    def to_representation(self, instance):
-        """Кастомизируем вывод данных."""
-        representation = super().to_representation(instance)
+    def get_is_author_subscribed(self, obj):
+        annotated = getattr(obj, 'is_author_subscribed', None)
+        if annotated is not None:
+            return annotated
+
+        return ClientReadSerializer(context=self.context).get_is_subscribed(
+            obj.author
+        )
+
+    def personalize(self, base, instance):
+        """Добавляет к общей части отметки пользователя и полные ссылки."""
         request = self.context.get('request')
+        representation = copy.deepcopy(base)
+        representation['is_favorited'] = self.get_is_favorited(instance)
+        representation['is_in_shopping_cart'] = (
+            self.get_is_in_shopping_cart(instance)
+        )
+        representation['favorites_count'] = instance.favorites_count
+        author = representation['author']
+        author['is_subscribed'] = self.get_is_author_subscribed(instance)
 
-        if instance.image:
-            representation['image'] = request.build_absolute_uri(
-                instance.image.url
-            )
-        else:
-            representation['image'] = ''
+        representation['image'] = (
+            request.build_absolute_uri(representation['image'])
+            if representation['image'] else ''
+        )
+        if author['avatar']:
+            author['avatar'] = request.build_absolute_uri(author['avatar'])
+        for variants in (
+            representation['image_variants'], author['avatar_variants']
+        ):
+            for variant, url in variants.items():
+                variants[variant] = request.build_absolute_uri(url)
 
-        return representation
+        return {field: representation[field] for field in self.Meta.fields}
+
+    def to_representation(self, instance):
+        """Кастомизируем вывод данных."""
+        return self.personalize(
+            get_base_representations([instance.pk])[instance.pk],
+            instance
+        )
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
@@ -223,7 +317,7 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         many=True,
         source='recipe_ingredients'
     )
-    image = Base64ImageField(required=True)
+    image = StreamingBase64ImageField(required=True)
 
     class Meta:
         model = Recipe
@@ -246,13 +340,25 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
 
         ingredient_ids = set()
         for ingredient_data in value:
-            current_id = ingredient_data['ingredient'].id
+            current_id = ingredient_data['ingredient']
             if current_id in ingredient_ids:
                 raise ValidationError(
                     {'ingredients': ['Ингредиенты не могут повторяться']}
                 )
             ingredient_ids.add(current_id)
 
+        ingredients = Ingredient.objects.in_bulk(ingredient_ids)
+        missing = ingredient_ids - ingredients.keys()
+        if missing:
+            raise ValidationError(
+                f'Недопустимый первичный ключ "{min(missing)}" - '
+                'объект не существует.'
+            )
+        for ingredient_data in value:
+            ingredient_data['ingredient'] = ingredients[
+                ingredient_data['ingredient']
+            ]
+
         return value
 
     def validate_cooking_time(self, value):
@@ -263,10 +369,10 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             )
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('recipe_ingredients')
         recipe = Recipe.objects.create(**validated_data)
-        recipe.save()
         self.add_ingredients(recipe=recipe, data=ingredients_data)
         return recipe
 
@@ -280,22 +386,53 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             ) for ingredient_data in data
         ])
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop('recipe_ingredients', None)
-        instance = super().update(instance, validated_data)
-        instance.image = validated_data.get('image', instance.image)
-        instance.save()
-        if ingredients_data is not None:
-            instance.ingredients.clear()
-
-            self.add_ingredients(recipe=instance, data=ingredients_data)
-        else:
+        if ingredients_data is None:
             raise ValidationError(
                 'Поле ingredients обязательно для обновления рецепта.'
             )
+        instance = super().update(instance, validated_data)
+        self.update_ingredients(recipe=instance, data=ingredients_data)
 
         return instance
 
+    @staticmethod
+    def update_ingredients(recipe, data):
+        """
+            Сравнивает новый состав рецепта с текущим: меняет количество,
+            добавляет и удаляет только отличающиеся строки.
+        """
+        amounts = {
+            ingredient_data['ingredient'].id: ingredient_data['amount']
+            for ingredient_data in data
+        }
+        changed = []
+        removed = []
+        for recipe_ingredient in recipe.recipe_ingredients.all():
+            amount = amounts.pop(recipe_ingredient.ingredient_id, None)
+            if amount is None:
+                removed.append(recipe_ingredient.pk)
+            elif amount != recipe_ingredient.amount:
+                recipe_ingredient.amount = amount
+                changed.append(recipe_ingredient)
+
+        if removed:
+            RecipeIngredient.objects.filter(pk__in=removed).delete()
+        if changed:
+            RecipeIngredient.objects.bulk_update(changed, ('amount',))
+        if amounts:
+            RecipeIngredient.objects.bulk_create([
+                RecipeIngredient(
+                    recipe=recipe,
+                    ingredient_id=ingredient_id,
+                    amount=amount
+                ) for ingredient_id, amount in amounts.items()
+            ])
+            # bulk_create не отправляет сигналы, а состав изменился.
+            schedule_similar_update(recipe.pk)
+
     def to_representation(self, instance):
         return RecipeReadSerializer(instance, context=self.context).data
 
@@ -307,15 +444,16 @@ class RecipeAdditionalSerializer(serializers.ModelSerializer):
     """
 
     image = Base64ImageField(required=False, allow_null=True)
+    image_variants = ImageVariantsField('image')
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_variants', 'cooking_time')
 
 
 class SubscribeListSerializer(ClientReadSerializer):
     recipes = serializers.SerializerMethodField()
-    recipes_count = serializers.SerializerMethodField()
+    recipes_count = serializers.IntegerField(read_only=True)
 
     class Meta(ClientReadSerializer.Meta):
         fields = tuple(
@@ -326,8 +464,8 @@ class SubscribeListSerializer(ClientReadSerializer):
             'recipes_count'
         )
 
-    def get_recipes(self, obj):
-        request = self.context.get('request')
+    @staticmethod
+    def get_recipes_limit(request):
         recipes_limit = request.query_params.get('recipes_limit', None)
 
         if recipes_limit is not None:
@@ -336,10 +474,16 @@ class SubscribeListSerializer(ClientReadSerializer):
             except ValueError:
                 recipes_limit = None
 
-        recipes_queryset = obj.recipes.all()
-        recipes_queryset = recipes_queryset[:recipes_limit]
+        if recipes_limit is not None and recipes_limit < 0:
+            recipes_limit = None
 
-        return RecipeAdditionalSerializer(recipes_queryset, many=True).data
+        return recipes_limit
 
-    def get_recipes_count(self, obj):
-        return obj.recipes.count()
+    def get_recipes(self, obj):
+        recipes_queryset = getattr(obj, 'limited_recipes', None)
+
+        if recipes_queryset is None:
+            recipes_limit = self.get_recipes_limit(self.context['request'])
+            recipes_queryset = obj.recipes.order_by('-id')[:recipes_limit]
+
+        return RecipeAdditionalSerializer(recipes_queryset, many=True).data
@@ -0,0 +1,97 @@
+"""Выгрузка списка покупок в файлы разных форматов."""
+import csv
+import io
+import os
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from .constans import (
+    SHOPPING_LIST_TITLE,
+    SHOPPING_LIST_PDF_FONT,
+    SHOPPING_LIST_PDF_FONT_SIZE,
+    SHOPPING_LIST_PDF_MARGIN,
+    SHOPPING_LIST_PDF_LINE_HEIGHT
+)
+
+PDF_FONT_NAME = 'ShoppingListFont'
+PDF_FALLBACK_FONT_NAME = 'Helvetica'
+
+
+def format_line(item):
+    return (
+        f'{item["ingredient__name"]}: {item["total_amount"]} '
+        f'{item["ingredient__measurement_unit"]}'
+    )
+
+
+def render_txt(items):
+    """Построчно отдает текстовый список покупок."""
+    yield f'{SHOPPING_LIST_TITLE}\n'
+    for item in items:
+        yield f'{format_line(item)}\n'
+
+
+def render_csv(items):
+    """Построчно отдает список покупок в формате CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(('name', 'amount', 'measurement_unit'))
+    for item in items:
+        writer.writerow((
+            item['ingredient__name'],
+            item['total_amount'],
+            item['ingredient__measurement_unit']
+        ))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def get_pdf_font():
+    """Регистрирует шрифт с кириллицей, если он доступен."""
+    if PDF_FONT_NAME in pdfmetrics.getRegisteredFontNames():
+        return PDF_FONT_NAME
+    font_path = getattr(
+        settings, 'SHOPPING_LIST_PDF_FONT', SHOPPING_LIST_PDF_FONT
+    )
+    if not os.path.exists(font_path):
+        return PDF_FALLBACK_FONT_NAME
+    pdfmetrics.registerFont(TTFont(PDF_FONT_NAME, font_path))
+    return PDF_FONT_NAME
+
+
+def render_pdf(items):
+    """
+        Отдает PDF со списком покупок.
+        Документ собирается целиком, наружу отдается частями.
+    """
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    font = get_pdf_font()
+    _, height = A4
+    top = height - SHOPPING_LIST_PDF_MARGIN
+    y = top
+
+    for line in [SHOPPING_LIST_TITLE, *map(format_line, items)]:
+        if y < SHOPPING_LIST_PDF_MARGIN:
+            pdf.showPage()
+            y = top
+        pdf.setFont(font, SHOPPING_LIST_PDF_FONT_SIZE)
+        pdf.drawString(SHOPPING_LIST_PDF_MARGIN, y, line)
+        y -= SHOPPING_LIST_PDF_LINE_HEIGHT
+
+    pdf.save()
+    buffer.seek(0)
+    yield from iter(lambda: buffer.read(io.DEFAULT_BUFFER_SIZE), b'')
+
+
+RENDERERS = {
+    'txt': (render_txt, 'text/plain; charset=utf-8'),
+    'csv': (render_csv, 'text/csv; charset=utf-8'),
+    'pdf': (render_pdf, 'application/pdf'),
+}
@@ -0,0 +1,103 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.constans import CLIENT_REPRESENTATION_FIELDS
+from recipes.images import variants_created
+from recipes.models import (
+    Client,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShortLink
+)
+from .authentication import token_cache
+from .cache import recipe_cache, short_link_cache
+from .indexes import ingredient_index, pantry_index, recipe_search_index
+
+
+def invalidate_recipes(pks):
+    if pks:
+        transaction.on_commit(partial(recipe_cache.delete_many, pks))
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredient_index(sender, **kwargs):
+    transaction.on_commit(ingredient_index.invalidate)
+
+
+@receiver(post_save, sender=Ingredient)
+def invalidate_ingredient_recipes(sender, instance, **kwargs):
+    invalidate_recipes(list(
+        RecipeIngredient.objects.filter(
+            ingredient=instance
+        ).values_list('recipe_id', flat=True).distinct()
+    ))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def invalidate_recipe(sender, instance, **kwargs):
+    invalidate_recipes([instance.pk])
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def invalidate_recipe_ingredients(sender, instance, **kwargs):
+    invalidate_recipes([instance.recipe_id])
+
+
+@receiver(post_save, sender=Client)
+def invalidate_author_recipes(sender, instance, update_fields=None, **kwargs):
+    if (
+        update_fields is not None
+        and not CLIENT_REPRESENTATION_FIELDS & set(update_fields)
+    ):
+        return
+    invalidate_recipes(list(instance.recipes.values_list('pk', flat=True)))
+
+
+@receiver(variants_created, sender=Recipe)
+def invalidate_recipe_variants(sender, pk, **kwargs):
+    invalidate_recipes([pk])
+
+
+@receiver(variants_created, sender=Client)
+def invalidate_avatar_variants(sender, pk, **kwargs):
+    invalidate_recipes(list(
+        Recipe.objects.filter(author_id=pk).values_list('pk', flat=True)
+    ))
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    transaction.on_commit(partial(token_cache.delete, instance.key))
+
+
+@receiver((post_save, post_delete), sender=Client)
+def forget_user_tokens(sender, instance, **kwargs):
+    """В кеше токенов лежит пользователь целиком, включая is_active."""
+    transaction.on_commit(partial(token_cache.delete_user, instance.pk))
+
+
+@receiver(post_delete, sender=ShortLink)
+def forget_short_link(sender, instance, **kwargs):
+    transaction.on_commit(partial(short_link_cache.delete, instance.code))
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver(post_save, sender=Ingredient)
+def invalidate_recipe_search_index(sender, **kwargs):
+    transaction.on_commit(recipe_search_index.invalidate)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+def update_pantry_recipe(sender, instance, **kwargs):
+    pantry_index.schedule_update(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def update_pantry_recipe_ingredients(sender, instance, **kwargs):
+    pantry_index.schedule_update(instance.recipe_id)
@@ -0,0 +1,23 @@
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from api.authentication import token_cache
+from api.cache import short_link_cache
+from api.indexes import ingredient_index, pantry_index, recipe_search_index
+from recipes.tests.base import FoodgramTestCase
+
+
+class ApiTestCase(FoodgramTestCase):
+    """Кеши и индексы процесса не переживают откат транзакции теста."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        token_cache.clear()
+        short_link_cache.clear()
+        for index in (ingredient_index, pantry_index, recipe_search_index):
+            index.invalidate()
+        self.author = self.create_user('author')
+        self.user = self.create_user('user')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.db.models.query import QuerySet
+
+from recipes.counters import batched
+from recipes.models import Favorite, Recipe
+from .base import ApiTestCase
+
+
+class BatchCountersTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        ingredients = self.create_ingredients(1)
+        with self.commit():
+            self.recipes = [
+                self.create_recipe(
+                    self.author, f'Рецепт {number}', ingredients
+                )
+                for number in range(3)
+            ]
+        self.ids = [recipe.pk for recipe in self.recipes]
+
+    def favorites_counts(self):
+        return list(Recipe.objects.filter(pk__in=self.ids).order_by(
+            'pk'
+        ).values_list('favorites_count', flat=True))
+
+    def batch(self, method, ids):
+        with self.commit():
+            response = getattr(self.client, method)(
+                '/api/recipes/batch/favorite/', {'ids': ids}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        return [item['status'] for item in response.json()['results']]
+
+    def test_add_and_remove(self):
+        Favorite.objects.create(author=self.user, recipe=self.recipes[0])
+        self.assertEqual(
+            self.batch('post', self.ids + [max(self.ids) + 1]),
+            ['exists', 'added', 'added', 'not_found']
+        )
+        self.assertEqual(self.favorites_counts(), [1, 1, 1])
+        self.assertEqual(
+            self.batch('delete', self.ids[1:]), ['removed', 'removed']
+        )
+        self.assertEqual(self.favorites_counts(), [1, 0, 0])
+
+    def test_concurrent_insert_not_counted_twice(self):
+        bulk_create = QuerySet.bulk_create
+        recipe = self.recipes[0]
+
+        def concurrent_bulk_create(queryset, objs, *args, **kwargs):
+            # Параллельный запрос успел добавить и посчитать ту же строку.
+            if queryset.model is Favorite:
+                bulk_create(queryset, [
+                    Favorite(author=self.user, recipe=recipe)
+                ])
+                Recipe.objects.filter(pk=recipe.pk).update(favorites_count=1)
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(
+            QuerySet, 'bulk_create', concurrent_bulk_create
+        ):
+            self.batch('post', self.ids)
+        self.assertEqual(self.favorites_counts(), [1, 1, 1])
+
+    def test_batched_signals_recount_once(self):
+        other = self.create_user('other')
+        with batched():
+            Favorite.objects.create(author=self.user, recipe=self.recipes[0])
+            Favorite.objects.create(author=other, recipe=self.recipes[0])
+            Favorite.objects.filter(author=other).delete()
+            self.assertEqual(self.favorites_counts(), [0, 0, 0])
+        self.assertEqual(self.favorites_counts(), [1, 0, 0])
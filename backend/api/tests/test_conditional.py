@@ -0,0 +1,74 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+
+from api.serializers import RecipeReadSerializer
+from recipes.models import Recipe
+from .base import ApiTestCase
+
+
+class ConditionalRequestsTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.recipe = self.create_recipe(
+                self.author, 'Рецепт', self.create_ingredients(1)
+            )
+
+    def assertChanged(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response['ETag']
+
+    def get_etag(self, url):
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        return etag
+
+    def test_recipe_etag_changes_after_writes(self):
+        url = '/api/recipes/'
+        etag = self.get_etag(url)
+        with self.commit():
+            self.client.post(f'/api/recipes/{self.recipe.pk}/favorite/')
+        etag = self.assertChanged(url, etag)
+        with self.commit():
+            Recipe.objects.filter(pk=self.recipe.pk).get().save()
+        self.assertChanged(url, etag)
+
+    def test_etag_is_personal(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        etag = self.get_etag(url)
+        self.client.force_authenticate(self.author)
+        self.assertChanged(url, etag)
+
+    def test_not_modified_skips_serialization(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        etag = self.get_etag(url)
+        with mock.patch.object(
+            RecipeReadSerializer, 'to_representation'
+        ) as to_representation:
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        to_representation.assert_not_called()
+
+    def test_user_etag_changes_after_subscribe(self):
+        url = '/api/users/'
+        etag = self.get_etag(url)
+        with self.commit():
+            self.client.post(f'/api/users/{self.author.pk}/subscribe/')
+        self.assertChanged(url, etag)
+
+    def test_ingredients_etag_changes_after_load(self):
+        url = '/api/ingredients/'
+        etag = self.get_etag(url)
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'ingredients.csv'
+            path.write_text('соль,г\n', encoding='utf-8')
+            with self.commit():
+                call_command('load_ingredients', path, stdout=StringIO())
+        self.assertChanged(url, etag)
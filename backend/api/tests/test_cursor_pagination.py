@@ -0,0 +1,55 @@
+from .base import ApiTestCase
+
+
+class CursorPaginationTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipes = [
+            self.create_recipe(self.author, f'Рецепт {number}', [])
+            for number in range(5)
+        ]
+
+    def pages(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_recipes_by_id(self):
+        self.assertEqual(
+            self.pages('/api/recipes/?pagination=cursor&limit=2'),
+            [recipe.pk for recipe in reversed(self.recipes)]
+        )
+
+    def test_pages_are_stable_after_insert(self):
+        response = self.client.get('/api/recipes/?pagination=cursor&limit=2')
+        self.create_recipe(self.author, 'Новый', [])
+
+        self.assertEqual(
+            self.pages(response.data['next']),
+            [recipe.pk for recipe in reversed(self.recipes[:3])]
+        )
+
+    def test_non_unique_ordering_rejected(self):
+        for ordering in ('popular', 'trending'):
+            with self.subTest(ordering=ordering):
+                response = self.client.get(
+                    f'/api/recipes/?pagination=cursor&ordering={ordering}'
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('pagination', response.data)
+
+    def test_subscriptions(self):
+        authors = [self.create_user(f'author{number}') for number in range(3)]
+        for author in authors:
+            self.client.post(f'/api/users/{author.pk}/subscribe/')
+
+        self.assertEqual(
+            self.pages('/api/users/subscriptions/?pagination=cursor&limit=2'),
+            [author.pk for author in authors]
+        )
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from recipes.models import Subscribe, TimelineEntry
+from .base import ApiTestCase
+
+
+class FeedTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = self.create_user('other')
+        with self.commit():
+            self.old = self.create_recipe(self.author, 'Старый', [])
+            self.create_recipe(self.other, 'Чужой', [])
+
+    def subscribe(self, author):
+        with self.commit():
+            Subscribe.objects.create(subscriber=self.user, author=author)
+
+    def feed(self, url='/api/recipes/feed/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def names(self):
+        return [recipe['name'] for recipe in self.feed()['results']]
+
+    def test_backfill_and_fan_out(self):
+        self.subscribe(self.author)
+        with self.commit():
+            self.create_recipe(self.author, 'Новый', [])
+
+        self.assertEqual(self.names(), ['Новый', 'Старый'])
+        self.assertEqual(
+            TimelineEntry.objects.filter(subscriber=self.user).count(), 2
+        )
+
+    def test_popular_author_merged_on_read(self):
+        with mock.patch('recipes.timeline.FEED_FANOUT_MAX_SUBSCRIBERS', 0):
+            self.subscribe(self.author)
+            with self.commit():
+                self.create_recipe(self.author, 'Новый', [])
+            self.assertFalse(TimelineEntry.objects.exists())
+            self.assertEqual(self.names(), ['Новый', 'Старый'])
+
+    def test_unsubscribe(self):
+        self.subscribe(self.author)
+        with self.commit():
+            Subscribe.objects.filter(subscriber=self.user).delete()
+
+        self.assertEqual(self.names(), [])
+
+    def test_keyset_pages(self):
+        self.subscribe(self.author)
+        self.subscribe(self.other)
+
+        first = self.feed('/api/recipes/feed/?limit=1')
+        second = self.feed(first['next'])
+
+        self.assertEqual(
+            [first['results'][0]['name'], second['results'][0]['name']],
+            ['Чужой', 'Старый']
+        )
+        self.assertIsNone(second['next'])
+
+    def test_invalid_before(self):
+        self.assertEqual(
+            self.client.get('/api/recipes/feed/?before=x').status_code, 400
+        )
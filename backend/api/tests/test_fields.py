@@ -0,0 +1,58 @@
+import base64
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from api.fields import StreamingBase64ImageField
+
+
+def image_data(size=(8, 8), image_format='PNG'):
+    content = BytesIO()
+    Image.new('RGB', size, 'red').save(content, image_format)
+    return 'data:image/png;base64,' + base64.b64encode(
+        content.getvalue()
+    ).decode()
+
+
+class StreamingBase64ImageFieldTest(SimpleTestCase):
+
+    def setUp(self):
+        self.field = StreamingBase64ImageField(file_name='photo')
+
+    def assertRejected(self, data, code):
+        with self.assertRaises(ValidationError) as context:
+            self.field.to_internal_value(data)
+        self.assertEqual(context.exception.detail[0].code, code)
+
+    def test_valid_image(self):
+        data = image_data()
+
+        file = self.field.to_internal_value(data)
+
+        self.assertEqual(file.name, 'photo.png')
+        self.assertEqual(file.content_type, 'image/png')
+        self.assertEqual(file.size, len(base64.b64decode(data.split(',')[1])))
+        self.assertTrue(file.read().startswith(b'\x89PNG'))
+
+    def test_invalid_payload(self):
+        for data in (
+            'not an image',
+            'data:image/png;base64,@@@@',
+            'data:image/png;base64,' + base64.b64encode(b'text').decode(),
+        ):
+            with self.subTest(data=data):
+                self.assertRejected(data, 'invalid')
+
+    @override_settings(UPLOAD_IMAGE_MAX_BYTES=64)
+    def test_byte_limit(self):
+        self.assertRejected(image_data((64, 64)), 'too_large')
+
+    @override_settings(UPLOAD_IMAGE_MAX_PIXELS=100)
+    def test_pixel_limit(self):
+        self.assertRejected(image_data((11, 10)), 'too_many_pixels')
+        self.assertTrue(self.field.to_internal_value(image_data((10, 10))))
+
+    def test_unsupported_format(self):
+        self.assertRejected(image_data(image_format='BMP'), 'invalid')
@@ -0,0 +1,43 @@
+from recipes.models import Ingredient
+from .base import ApiTestCase
+
+
+class IngredientAutocompleteTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        Ingredient.objects.bulk_create([
+            Ingredient(name=name, measurement_unit='г')
+            for name in (
+                'Сахарная пудра', 'сахар', 'Соль', 'Тростниковый сахар'
+            )
+        ])
+
+    def names(self, name, **params):
+        response = self.client.get(
+            '/api/ingredients/', {'name': name, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [item['name'] for item in response.data]
+
+    def test_prefix_before_substring(self):
+        self.assertEqual(
+            self.names('САХ'),
+            ['сахар', 'Сахарная пудра', 'Тростниковый сахар']
+        )
+
+    def test_short_query_matches_substring(self):
+        self.assertEqual(self.names('ль'), ['Соль'])
+        self.assertEqual(
+            self.names('с'),
+            ['сахар', 'Сахарная пудра', 'Соль', 'Тростниковый сахар']
+        )
+
+    def test_limit(self):
+        self.assertEqual(self.names('сах', limit=1), ['сахар'])
+
+    def test_index_rebuilt_after_change(self):
+        self.names('сах')
+        with self.commit():
+            Ingredient.objects.create(name='Сахарин', measurement_unit='г')
+        self.assertIn('Сахарин', self.names('сах'))
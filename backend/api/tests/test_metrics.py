@@ -0,0 +1,49 @@
+from django.test import SimpleTestCase
+
+from api.metrics import Histogram, format_labels
+from .base import ApiTestCase
+
+
+class HistogramTest(SimpleTestCase):
+
+    def test_cumulative_buckets(self):
+        histogram = Histogram('latency', 'Время.', ('view',), (1, 5))
+        for value in (0.5, 3, 3, 10):
+            histogram.add(('RecipeViewSet',), value)
+
+        self.assertEqual(list(histogram.lines())[2:], [
+            'foodgram_latency_bucket{view="RecipeViewSet",le="1"} 1',
+            'foodgram_latency_bucket{view="RecipeViewSet",le="5"} 3',
+            'foodgram_latency_bucket{view="RecipeViewSet",le="+Inf"} 4',
+            'foodgram_latency_sum{view="RecipeViewSet"} 16.5',
+            'foodgram_latency_count{view="RecipeViewSet"} 4',
+        ])
+
+    def test_label_escaping(self):
+        self.assertEqual(
+            format_labels(('view',), ('a"b\\c',)), '{view="a\\"b\\\\c"}'
+        )
+
+
+class MetricsEndpointTest(ApiTestCase):
+
+    def test_request_recorded_per_action(self):
+        with self.commit():
+            self.create_recipe(self.author, 'Суп', [])
+        self.client.get('/api/recipes/')
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        content = response.content.decode()
+        endpoint = 'view="RecipeViewSet",action="list"'
+        for line in (
+            f'foodgram_http_requests_total{{{endpoint},method="GET",'
+            'status="200"}',
+            f'foodgram_db_queries_per_request_count{{{endpoint}}}',
+            f'foodgram_http_response_size_bytes_count{{{endpoint}}}',
+            f'foodgram_cache_requests_total{{{endpoint},cache="recipe",'
+            'result="miss"}',
+        ):
+            self.assertIn(line, content)
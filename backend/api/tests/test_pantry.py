@@ -0,0 +1,85 @@
+from api.indexes import pantry_index
+from .base import ApiTestCase
+
+
+class PantryTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingredients = self.create_ingredients(6)
+        first, second, third, fourth, fifth, sixth = self.ingredients
+        with self.commit():
+            self.full = self.create_recipe(
+                self.author, 'Из двух', [first, second]
+            )
+            self.one_missing = self.create_recipe(
+                self.author, 'Без одного', [first, second, third]
+            )
+            self.many_missing = self.create_recipe(
+                self.author, 'Без трех', [first, fourth, fifth, sixth]
+            )
+            self.self_only = self.create_recipe(
+                self.author, 'Без продуктов', [sixth]
+            )
+
+    def pantry(self, ingredients, **params):
+        response = self.client.get('/api/recipes/pantry/', {
+            'ingredients': ','.join(str(item.pk) for item in ingredients),
+            **params
+        })
+        self.assertEqual(response.status_code, 200)
+        return [
+            (
+                recipe['name'],
+                [item['name'] for item in recipe['missing_ingredients']]
+            )
+            for recipe in response.json()['results']
+        ]
+
+    def test_missing_ranking(self):
+        first, second, third = self.ingredients[:3]
+        self.assertEqual(self.pantry([first, second]), [
+            ('Из двух', []),
+            ('Без одного', [third.name]),
+        ])
+        self.assertEqual(
+            [name for name, _ in self.pantry([first, second], max_missing=3)],
+            ['Из двух', 'Без одного', 'Без трех']
+        )
+        self.assertEqual(
+            self.pantry([first], max_missing=0), []
+        )
+
+    def test_index_updated_after_edit(self):
+        first, second = self.ingredients[:2]
+        self.pantry([first, second])
+        self.client.force_authenticate(self.author)
+        with self.commit():
+            response = self.client.patch(
+                f'/api/recipes/{self.one_missing.pk}/',
+                {
+                    'name': 'Без одного',
+                    'text': 'Описание',
+                    'cooking_time': 10,
+                    'ingredients': [{'id': first.pk, 'amount': 1}]
+                },
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.pantry([first], max_missing=0), [
+            ('Без одного', []),
+        ])
+        self.assertEqual(
+            pantry_index.missing(self.full.pk, {first.pk}), [second.pk]
+        )
+
+    def test_invalid_request(self):
+        self.assertEqual(
+            self.client.get('/api/recipes/pantry/').status_code, 400
+        )
+        self.assertEqual(
+            self.client.get(
+                '/api/recipes/pantry/', {'ingredients': 'x'}
+            ).status_code,
+            400
+        )
@@ -0,0 +1,69 @@
+from api.cache import recipe_cache
+from recipes.models import Favorite, Ingredient, RecipeIngredient
+from .base import ApiTestCase
+
+
+class RecipeCacheTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingredient, = self.create_ingredients(1)
+        with self.commit():
+            self.recipe = self.create_recipe(
+                self.author, 'Суп', [self.ingredient]
+            )
+        self.url = f'/api/recipes/{self.recipe.pk}/'
+
+    def get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def assertInvalidated(self):
+        self.assertEqual(recipe_cache.get_many([self.recipe.pk]), {})
+
+    def test_base_cached_and_flags_personal(self):
+        Favorite.objects.create(author=self.user, recipe=self.recipe)
+        self.assertTrue(self.get()['is_favorited'])
+        self.assertIn(self.recipe.pk, recipe_cache.get_many([self.recipe.pk]))
+
+        self.client.force_authenticate(self.author)
+        data = self.get()
+
+        self.assertFalse(data['is_favorited'])
+        self.assertEqual(data['name'], 'Суп')
+
+    def test_invalidated_by_ingredient(self):
+        self.get()
+        self.ingredient.name = 'соль'
+        with self.commit():
+            self.ingredient.save()
+        self.assertInvalidated()
+        self.assertEqual(self.get()['ingredients'][0]['name'], 'соль')
+
+    def test_invalidated_by_recipe_ingredients(self):
+        self.get()
+        with self.commit():
+            RecipeIngredient.objects.create(
+                recipe=self.recipe,
+                ingredient=Ingredient.objects.create(
+                    name='вода', measurement_unit='мл'
+                ),
+                amount=1
+            )
+        self.assertInvalidated()
+        self.assertEqual(len(self.get()['ingredients']), 2)
+
+    def test_invalidated_by_author(self):
+        self.get()
+        self.author.first_name = 'Автор'
+        with self.commit():
+            self.author.save(update_fields=['first_name'])
+        self.assertInvalidated()
+        self.assertEqual(self.get()['author']['first_name'], 'Автор')
+
+    def test_not_invalidated_by_unrelated_author_fields(self):
+        self.get()
+        with self.commit():
+            self.author.save(update_fields=['last_login'])
+        self.assertIn(self.recipe.pk, recipe_cache.get_many([self.recipe.pk]))
@@ -0,0 +1,78 @@
+from api.serializers import RecipeWriteSerializer
+from recipes.models import RecipeIngredient
+from .base import ApiTestCase
+
+
+class RecipeIngredientsUpdateTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingredients = self.create_ingredients(4)
+        self.recipe = self.create_recipe(
+            self.author, 'Суп', self.ingredients[:3]
+        )
+
+    def serializer(self, amounts):
+        return RecipeWriteSerializer(
+            self.recipe,
+            data={'ingredients': [
+                {'id': ingredient.pk, 'amount': amount}
+                for ingredient, amount in amounts
+            ]},
+            partial=True
+        )
+
+    def rows(self):
+        return dict(
+            RecipeIngredient.objects.filter(recipe=self.recipe).values_list(
+                'ingredient_id', 'pk'
+            )
+        )
+
+    def amounts(self):
+        return dict(
+            RecipeIngredient.objects.filter(recipe=self.recipe).values_list(
+                'ingredient_id', 'amount'
+            )
+        )
+
+    def test_ingredients_checked_in_one_query(self):
+        serializer = self.serializer(
+            (ingredient, 1) for ingredient in self.ingredients
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(serializer.is_valid())
+
+    def test_unknown_ingredient(self):
+        serializer = self.serializer([(self.ingredients[0], 1)])
+        serializer.initial_data['ingredients'].append(
+            {'id': self.ingredients[-1].pk + 1, 'amount': 1}
+        )
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('ingredients', serializer.errors)
+
+    def test_only_changed_rows_touched(self):
+        first, second, third, fourth = self.ingredients
+        rows = self.rows()
+        serializer = self.serializer([(first, 1), (second, 5), (fourth, 2)])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        with self.commit():
+            serializer.save()
+
+        self.assertEqual(
+            self.amounts(), {first.pk: 1, second.pk: 5, fourth.pk: 2}
+        )
+        new_rows = self.rows()
+        self.assertEqual(new_rows[first.pk], rows[first.pk])
+        self.assertEqual(new_rows[second.pk], rows[second.pk])
+
+    def test_unchanged_ingredients_not_written(self):
+        serializer = self.serializer(
+            (ingredient, 1) for ingredient in self.ingredients[:3]
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        data = serializer.validated_data['recipe_ingredients']
+
+        with self.assertNumQueries(1):
+            RecipeWriteSerializer.update_ingredients(self.recipe, data)
@@ -0,0 +1,41 @@
+from recipes.models import Ingredient, Recipe
+from .base import ApiTestCase
+
+
+class SearchTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        beet, cabbage, cereal = Ingredient.objects.bulk_create([
+            Ingredient(name='свекла', measurement_unit='г'),
+            Ingredient(name='капуста', measurement_unit='г'),
+            Ingredient(name='крупа', measurement_unit='г'),
+        ])
+        with self.commit():
+            self.in_name = self.create_recipe(
+                self.author, 'Борщ', [beet, cabbage], text='Первое блюдо'
+            )
+            self.in_text = self.create_recipe(
+                self.author, 'Щи', [cabbage], text='Почти как борщ'
+            )
+            self.create_recipe(
+                self.author, 'Каша', [cereal], text='Каша на завтрак'
+            )
+
+    def search(self, query):
+        response = self.client.get('/api/recipes/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [recipe['name'] for recipe in response.json()['results']]
+
+    def test_name_ranked_above_text(self):
+        self.assertEqual(self.search('борщ'), ['Борщ', 'Щи'])
+
+    def test_all_words_required(self):
+        self.assertEqual(self.search('борщ капуста'), ['Борщ', 'Щи'])
+        self.assertEqual(self.search('борщ свекла'), ['Борщ'])
+        self.assertEqual(self.search('борщ крупа'), [])
+
+    def test_index_updated_after_write(self):
+        with self.commit():
+            Recipe.objects.filter(pk=self.in_text.pk).get().delete()
+        self.assertEqual(self.search('борщ'), ['Борщ'])
@@ -0,0 +1,51 @@
+from recipes.models import RecipeIngredient, ShoppingCart
+from .base import ApiTestCase
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingListTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        salt, water = self.create_ingredients(2)
+        first = self.create_recipe(self.author, 'Суп', [salt, water])
+        second = self.create_recipe(self.author, 'Каша', [salt])
+        RecipeIngredient.objects.filter(recipe=first, ingredient=salt).update(
+            amount=5
+        )
+        ShoppingCart.objects.bulk_create([
+            ShoppingCart(author=self.user, recipe=recipe)
+            for recipe in (first, second)
+        ])
+
+    def download(self, file_format):
+        response = self.client.get(URL, {'file_format': file_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_amounts_summed_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(URL)
+            content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines()[1:], [
+            'ингредиент 0: 6 г',
+            'ингредиент 1: 1 г',
+        ])
+
+    def test_csv(self):
+        self.assertEqual(self.download('csv').decode().splitlines(), [
+            'name,amount,measurement_unit',
+            'ингредиент 0,6,г',
+            'ингредиент 1,1,г',
+        ])
+
+    def test_pdf(self):
+        self.assertTrue(self.download('pdf').startswith(b'%PDF'))
+
+    def test_unknown_format_and_empty_cart(self):
+        self.assertEqual(
+            self.client.get(URL, {'file_format': 'doc'}).status_code, 400
+        )
+        ShoppingCart.objects.all().delete()
+        self.assertEqual(self.client.get(URL).status_code, 404)
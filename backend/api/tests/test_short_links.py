@@ -0,0 +1,47 @@
+from django.urls import reverse
+
+from recipes.constans import SHORT_LINK_CODE_LENGTH
+from recipes.shortlinks import ALPHABET
+from .base import ApiTestCase
+
+
+class ShortLinkTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.recipe = self.create_recipe(self.author, 'Суп', [])
+
+    def get_link(self):
+        response = self.client.get(f'/api/recipes/{self.recipe.pk}/get-link/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['short-link']
+
+    def test_code_is_stable(self):
+        link = self.get_link()
+        code = link.rstrip('/').rsplit('/', 1)[-1]
+
+        self.assertEqual(self.get_link(), link)
+        self.assertEqual(len(code), SHORT_LINK_CODE_LENGTH)
+        self.assertTrue(set(code) <= set(ALPHABET))
+
+    def test_redirect_served_from_cache(self):
+        link = self.get_link()
+
+        response = self.client.get(link)
+        self.assertRedirects(
+            response, f'/recipes/{self.recipe.pk}',
+            fetch_redirect_response=False
+        )
+        with self.assertNumQueries(0):
+            self.client.get(link)
+
+    def test_unknown_and_deleted(self):
+        self.assertEqual(
+            self.client.get(reverse('short-link', args=['nope'])).status_code,
+            404
+        )
+        link = self.get_link()
+        self.client.get(link)
+        with self.commit():
+            self.recipe.delete()
+        self.assertEqual(self.client.get(link).status_code, 404)
@@ -0,0 +1,21 @@
+from .base import ApiTestCase
+
+
+class SimilarRecipesApiTest(ApiTestCase):
+
+    def test_similar_recipes(self):
+        ingredients = self.create_ingredients(6)
+        with self.commit():
+            recipe = self.create_recipe(self.author, 'A', ingredients)
+            similar = self.create_recipe(self.author, 'B', ingredients[:5])
+
+        response = self.client.get(f'/api/recipes/{recipe.pk}/similar/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [similar.pk])
+
+    def test_unknown_recipe(self):
+        for pk in ('abc', '0'):
+            with self.subTest(pk=pk):
+                response = self.client.get(f'/api/recipes/{pk}/similar/')
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,68 @@
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from api.authentication import CachedTokenAuthentication
+from .base import ApiTestCase
+
+
+class TokenCacheTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def authenticate(self):
+        return self.authentication.authenticate_credentials(self.token.key)
+
+    def test_cached_token_skips_database(self):
+        self.authenticate()
+
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_request_changes_do_not_leak_into_cache(self):
+        self.authenticate()[0].first_name = 'Изменено'
+
+        self.assertEqual(self.authenticate()[0].first_name, 'user')
+
+    def test_logout(self):
+        self.authenticate()
+
+        with self.commit():
+            self.token.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_deactivated_user(self):
+        self.authenticate()
+
+        self.user.is_active = False
+        with self.commit():
+            self.user.save(update_fields=['is_active'])
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_password_change_refreshes_user(self):
+        self.authenticate()
+
+        self.user.set_password('NewPassword12345')
+        with self.commit():
+            self.user.save(update_fields=['password'])
+
+        user, _ = self.authenticate()
+        self.assertTrue(user.check_password('NewPassword12345'))
+
+    def test_deleted_user(self):
+        self.authenticate()
+
+        with self.commit():
+            self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from recipes.models import Favorite
+from .base import ApiTestCase
+
+
+class TrendingApiTest(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        with self.commit():
+            self.recipes = [
+                self.create_recipe(self.author, f'Рецепт {number}', [])
+                for number in range(2)
+            ]
+
+    def names(self, url):
+        return [item['name'] for item in self.client.get(url).data['results']]
+
+    def test_trending_order(self):
+        Favorite.objects.bulk_create([
+            Favorite(author=self.user, recipe=self.recipes[0])
+        ])
+        with self.commit():
+            call_command('update_trending', stdout=StringIO())
+
+        self.assertEqual(
+            self.names('/api/recipes/?ordering=trending'),
+            ['Рецепт 0', 'Рецепт 1']
+        )
+
+    def test_trending_etag_changes_after_rescore(self):
+        url = '/api/recipes/?ordering=trending'
+        Favorite.objects.bulk_create([
+            Favorite(author=self.user, recipe=self.recipes[0])
+        ])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        with self.commit():
+            call_command('update_trending', stdout=StringIO())
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
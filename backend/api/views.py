@@ -1,13 +1,16 @@
-import os
+from itertools import chain
 
+from django.db import transaction
+from django.db.models import Sum, Value
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from rest_framework import status, viewsets, filters
+from django.shortcuts import get_object_or_404, redirect
+from rest_framework import status, viewsets
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.utils.urls import replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
-from django.http import FileResponse
-from dotenv import load_dotenv
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 
 from .pagination import CustomPageNumberPagination
 from .permissions import Owner, RecipePermission
@@ -18,9 +21,26 @@ from recipes.models import (
     ShoppingCart,
     Favorite,
     Subscribe,
-    RecipeIngredient
+    RecipeIngredient,
+    ShortLink,
+    SimilarRecipe
 )
+from recipes.constans import (
+    SIMILAR_TOP_K,
+    VERSION_FAVORITES,
+    VERSION_INGREDIENTS,
+    VERSION_RECIPES,
+    VERSION_SHOPPING_CART,
+    VERSION_SUBSCRIPTIONS,
+    VERSION_USERS
+)
+from recipes.counters import batched, recount_rows
+from recipes.shortlinks import get_code
+from recipes.tasks import run_in_background
+from recipes.timeline import backfill, read_feed
+from recipes.versions import bump
 from .serializers import (
+    BatchIdsSerializer,
     ClientAvatarSerializer,
     IngredientSerializer,
     RecipeAdditionalSerializer,
@@ -31,8 +51,81 @@ from .serializers import (
     RecipeWriteSerializer
 )
 from .filters import RecipeFilter
+from .constans import (
+    INGREDIENT_SEARCH_LIMIT,
+    INGREDIENT_SEARCH_MAX_LIMIT,
+    PANTRY_MAX_INGREDIENTS,
+    PANTRY_MAX_MISSING,
+    PANTRY_MAX_MISSING_LIMIT,
+    SHOPPING_LIST_FILENAME,
+    SHOPPING_LIST_FORMATS
+)
+from .cache import short_link_cache
+from .conditional import conditional
+from .indexes import ingredient_index, pantry_index
+from .shopping_list import RENDERERS
+
+RECIPE_VERSIONS = (
+    VERSION_RECIPES,
+    VERSION_FAVORITES,
+    VERSION_SHOPPING_CART,
+    VERSION_SUBSCRIPTIONS
+)
+
+
+def batch_relations(request, model, owner_field, target_field, targets,
+                    version, excluded=(), on_added=None):
+    """
+        Добавляет (POST) или удаляет (DELETE) связи пользователя
+        с объектами из ids одним запросом и отдает статус каждого id.
+    """
+    serializer = BatchIdsSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    ids = serializer.validated_data['ids']
+    target_id = f'{target_field}_id'
+    found = set(targets.filter(pk__in=ids).values_list('pk', flat=True))
+    linked = set(model.objects.filter(
+        **{owner_field: request.user, f'{target_id}__in': ids}
+    ).values_list(target_id, flat=True))
+
+    results = []
+    changed = []
+    for pk in ids:
+        if pk not in found:
+            result = 'not_found'
+        elif pk in excluded:
+            result = 'forbidden'
+        elif request.method == 'POST':
+            result = 'exists' if pk in linked else 'added'
+        else:
+            result = 'removed' if pk in linked else 'absent'
+        if result in ('added', 'removed'):
+            changed.append(pk)
+        results.append({'id': pk, 'status': result})
+
+    if changed:
+        with transaction.atomic(), batched():
+            if request.method == 'POST':
+                model.objects.bulk_create(
+                    [
+                        model(**{owner_field: request.user, target_id: pk})
+                        for pk in changed
+                    ],
+                    ignore_conflicts=True
+                )
+                # bulk_create не отправляет сигналы, а часть строк
+                # могла быть уже вставлена параллельным запросом.
+                recount_rows(model, changed)
+                bump(version)
+                if on_added is not None:
+                    for pk in changed:
+                        on_added(pk)
+            else:
+                model.objects.filter(
+                    **{owner_field: request.user, f'{target_id}__in': changed}
+                ).delete()
 
-load_dotenv()
+    return Response({'results': results})
 
 
 class ClientViewSet(viewsets.ModelViewSet):
@@ -42,6 +135,9 @@ class ClientViewSet(viewsets.ModelViewSet):
     pagination_class = CustomPageNumberPagination
     http_method_names = ['get', 'post', 'delete', 'put']
 
+    def get_queryset(self):
+        return super().get_queryset().with_subscription(self.request.user)
+
     def create(self, request):
         serializer = ClientWriteSerializer(
             data=request.data,
@@ -55,9 +151,13 @@ class ClientViewSet(viewsets.ModelViewSet):
             return Response(data, status=201)
         return Response(serializer.errors, status=400)
 
+    @conditional(VERSION_USERS, VERSION_SUBSCRIPTIONS, personal=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional(VERSION_USERS, VERSION_SUBSCRIPTIONS, personal=True)
     def retrieve(self, request, pk=None):
-        queryset = Client.objects.all()
-        user = get_object_or_404(queryset, pk=pk)
+        user = get_object_or_404(self.get_queryset(), pk=pk)
         serializer = ClientReadSerializer(user, context={'request': request})
         return Response(serializer.data)
 
@@ -79,7 +179,7 @@ class ClientViewSet(viewsets.ModelViewSet):
             )
 
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=['password'])
         return Response(
             {'status': 'Пароль изменен'},
             status=status.HTTP_204_NO_CONTENT
@@ -88,8 +188,12 @@ class ClientViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='subscriptions')
     def subscriptions(self, request):
         queryset = Client.objects.filter(
-            authors__subscriber=self.request.user
-        ).distinct()
+            authors__subscriber=request.user
+        ).annotate(
+            is_subscribed=Value(True)
+        ).with_recipes(
+            SubscribeListSerializer.get_recipes_limit(request)
+        ).order_by('id')
 
         page = self.paginate_queryset(queryset)
 
@@ -134,7 +238,8 @@ class ClientViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            Subscribe.objects.create(subscriber=subscriber, author=author)
+            with transaction.atomic():
+                Subscribe.objects.create(subscriber=subscriber, author=author)
             serializer = SubscribeListSerializer(
                 author,
                 context={'request': request}
@@ -155,6 +260,27 @@ class ClientViewSet(viewsets.ModelViewSet):
                 )
             return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        methods=['post', 'delete'],
+        detail=False,
+        url_path='batch/subscribe',
+        permission_classes=[IsAuthenticated]
+    )
+    def subscribe_batch(self, request):
+        """Подписка и отписка сразу от нескольких авторов."""
+        return batch_relations(
+            request,
+            Subscribe,
+            owner_field='subscriber',
+            target_field='author',
+            targets=Client.objects.all(),
+            version=VERSION_SUBSCRIPTIONS,
+            excluded={request.user.pk},
+            on_added=lambda author_id: run_in_background(
+                backfill, request.user.pk, author_id
+            )
+        )
+
     @action(
         methods=['get'],
         detail=False,
@@ -181,9 +307,8 @@ class ClientViewSet(viewsets.ModelViewSet):
         if request.method == 'DELETE':
             try:
                 user = request.user
-                user.avatar.delete(save=False)
                 user.avatar = None
-                user.save()
+                user.save(update_fields=['avatar'])
                 return Response(
                     {'message': 'Аватар успешко удален.'},
                     status=status.HTTP_204_NO_CONTENT
@@ -215,9 +340,32 @@ class IngredientViewSet(viewsets.ModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
+    filter_backends = []
     http_method_names = ['get']
-    filterset_fields = ['name']
+
+    @conditional(VERSION_INGREDIENTS)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @conditional(VERSION_INGREDIENTS)
+    def list(self, request, *args, **kwargs):
+        """
+            Автодополнение по параметру name: сначала совпадения
+            по началу названия, затем по подстроке.
+        """
+        name = request.query_params.get('name')
+        if not name:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            limit = int(request.query_params.get(
+                'limit', INGREDIENT_SEARCH_LIMIT
+            ))
+        except ValueError:
+            limit = INGREDIENT_SEARCH_LIMIT
+        limit = max(1, min(limit, INGREDIENT_SEARCH_MAX_LIMIT))
+
+        return Response(ingredient_index.search(name, limit))
 
 
 class RecipeViewSet(viewsets.ModelViewSet):
@@ -240,15 +388,142 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-            Получаем рецепты, которые находятся
-             в корзине текущего пользователя.
+            Получаем рецепты с отметками текущего пользователя.
+            Авторы и ингредиенты подгружаются только для рецептов,
+            которых нет в кеше представлений.
+        """
+        return super().get_queryset().with_user_flags(self.request.user)
+
+    @conditional(*RECIPE_VERSIONS, personal=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional(*RECIPE_VERSIONS, personal=True)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(
+        detail=False, methods=['get'], permission_classes=[IsAuthenticated]
+    )
+    def feed(self, request):
+        """
+            Рецепты авторов из подписок, новые первыми.
+            Следующая страница запрашивается по ссылке next
+            (параметр before - id последнего рецепта страницы).
+        """
+        paginator = self.pagination_class()
+        try:
+            before = request.query_params.get('before')
+            before = int(before) if before else None
+            limit = int(request.query_params.get(
+                paginator.page_size_query_param, paginator.page_size
+            ))
+        except ValueError:
+            return Response(
+                {'error': 'before и limit должны быть числами.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, paginator.max_page_size))
+
+        recipe_ids = read_feed(request.user, before, limit + 1)
+        page = recipe_ids[:limit]
+        recipes = self.get_queryset().in_bulk(page)
+        next_url = None
+        if len(recipe_ids) > limit:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), 'before', page[-1]
+            )
+        return Response({
+            'next': next_url,
+            'results': RecipeReadSerializer(
+                [recipes[pk] for pk in page if pk in recipes],
+                many=True,
+                context={'request': request}
+            ).data
+        })
+
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def pantry(self, request):
+        """
+            Рецепты из имеющихся продуктов: ingredients - id через запятую
+            или повторяющимся параметром, max_missing - сколько продуктов
+            может не хватать. У каждого рецепта указаны недостающие.
         """
-        return super().get_queryset()
+        try:
+            pantry = {
+                int(ingredient_id)
+                for value in request.query_params.getlist('ingredients')
+                for ingredient_id in value.split(',') if ingredient_id
+            }
+            max_missing = int(request.query_params.get(
+                'max_missing', PANTRY_MAX_MISSING
+            ))
+        except ValueError:
+            return Response(
+                {'error': 'ingredients и max_missing должны быть числами.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not pantry or len(pantry) > PANTRY_MAX_INGREDIENTS:
+            return Response(
+                {'error': (
+                    'Укажите от 1 до '
+                    f'{PANTRY_MAX_INGREDIENTS} ингредиентов.'
+                )},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_missing = max(0, min(max_missing, PANTRY_MAX_MISSING_LIMIT))
+
+        paginator = self.pagination_class()
+        paginator.cursor_pagination_class = None
+        page = paginator.paginate_queryset(
+            pantry_index.match(pantry, max_missing), request, self
+        )
+        recipes = self.get_queryset().in_bulk(page)
+        recipes = [recipes[pk] for pk in page if pk in recipes]
+        missing = {
+            recipe.pk: pantry_index.missing(recipe.pk, pantry)
+            for recipe in recipes
+        }
+        ingredients = Ingredient.objects.in_bulk(
+            set(chain.from_iterable(missing.values()))
+        )
+        data = RecipeReadSerializer(
+            recipes, many=True, context={'request': request}
+        ).data
+        for item in data:
+            item['missing_ingredients'] = IngredientSerializer(
+                [
+                    ingredients[ingredient_id]
+                    for ingredient_id in missing[item['id']]
+                    if ingredient_id in ingredients
+                ],
+                many=True
+            ).data
+        return paginator.get_paginated_response(data)
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def similar(self, request, pk=None):
+        """Рецепты с самым похожим составом ингредиентов."""
+        recipe = self.get_object()
+        rows = SimilarRecipe.objects.filter(
+            recipe=recipe
+        ).select_related('similar').order_by('-score')[:SIMILAR_TOP_K]
+        data = []
+        for row in rows:
+            item = RecipeAdditionalSerializer(
+                row.similar, context={'request': request}
+            ).data
+            item['similarity'] = round(row.score, 3)
+            data.append(item)
+        return Response(data)
 
     @action(detail=True, methods=['get'], url_path='get-link')
     def get_link(self, request, pk=None):
+        """Короткая ссылка на рецепт."""
         recipe = self.get_object()
-        short_link = f'({os.getenv("LINK_DOMEN")}{recipe.pk})'
+        short_link = request.build_absolute_uri(
+            reverse('short-link', args=[get_code(recipe.pk)])
+        )
         return Response({'short-link': short_link})
 
     @action(
@@ -295,41 +570,65 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        methods=['post', 'delete'],
+        url_path='batch/shopping_cart'
+    )
+    def shopping_cart_batch(self, request):
+        """Добавление и удаление сразу нескольких рецептов в корзине."""
+        return batch_relations(
+            request,
+            ShoppingCart,
+            owner_field='author',
+            target_field='recipe',
+            targets=Recipe.objects.all(),
+            version=VERSION_SHOPPING_CART
+        )
+
     @action(
         detail=False,
         permission_classes=[IsAuthenticated],
         methods=['get']
     )
     def download_shopping_cart(self, request):
-        """Скачать список покупок."""
-        shopping_cart_items = request.user.shopping_cart.all()
-        shopping_cart = {}
-        for item_shopping_cart in shopping_cart_items:
-            recipe = item_shopping_cart.recipe
-            for item in RecipeIngredient.objects.filter(recipe=recipe):
-                if item.ingredient in shopping_cart:
-                    shopping_cart[item.ingredient] += item.amount
-                else:
-                    shopping_cart[item.ingredient] = item.amount
-
-        if not shopping_cart_items.exists():
-            return Response({'message': 'Корзина покупок пуста.'}, status=404)
-
-        shopping_cart_list = [
-            'Список покупок:'
-        ]
-
-        for key in shopping_cart:
-            shopping_cart_list.append(
-                f'{key}: {shopping_cart[key]} {key.measurement_unit}'
+        """
+            Скачать список покупок.
+            Формат файла задается параметром file_format (txt, csv, pdf).
+        """
+        file_format = request.query_params.get('file_format', 'txt')
+        if file_format not in SHOPPING_LIST_FORMATS:
+            return Response(
+                {'error': (
+                    'Неподдерживаемый формат файла. Доступные форматы: '
+                    f'{", ".join(SHOPPING_LIST_FORMATS)}.'
+                )},
+                status=status.HTTP_400_BAD_REQUEST
             )
 
-        return FileResponse(
-            ("\n".join(shopping_cart_list)),
-            as_attachment=True,
-            filename="shopping_list.txt",
-            content_type="text/plain; charset=utf-8",
+        ingredients = RecipeIngredient.objects.filter(
+            recipe__shopping_cart__author=request.user
+        ).values(
+            'ingredient__name',
+            'ingredient__measurement_unit'
+        ).annotate(
+            total_amount=Sum('amount')
+        ).order_by('ingredient__name').iterator()
+
+        first_item = next(ingredients, None)
+        if first_item is None:
+            return Response({'message': 'Корзина покупок пуста.'}, status=404)
+
+        render, content_type = RENDERERS[file_format]
+        response = StreamingHttpResponse(
+            render(chain([first_item], ingredients)),
+            content_type=content_type
         )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{SHOPPING_LIST_FILENAME}.{file_format}"'
+        )
+        return response
 
     @action(
         detail=True,
@@ -366,3 +665,31 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(
+        detail=False,
+        permission_classes=[IsAuthenticated],
+        methods=['post', 'delete'],
+        url_path='batch/favorite'
+    )
+    def favorite_batch(self, request):
+        """Добавление и удаление сразу нескольких рецептов в избранном."""
+        return batch_relations(
+            request,
+            Favorite,
+            owner_field='author',
+            target_field='recipe',
+            targets=Recipe.objects.all(),
+            version=VERSION_FAVORITES
+        )
+
+
+def short_link_redirect(request, code):
+    """Переход по короткой ссылке на страницу рецепта."""
+    recipe_id = short_link_cache.get(code)
+    if recipe_id is None:
+        recipe_id = get_object_or_404(
+            ShortLink.objects.only('recipe_id'), code=code
+        ).recipe_id
+        short_link_cache.set(code, recipe_id)
+    return redirect(f'/recipes/{recipe_id}')
@@ -2,11 +2,17 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 
+from api.metrics import metrics
+from api.views import short_link_redirect
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path('api/auth/', include('djoser.urls.authtoken')),
+    path('s/<str:code>/', short_link_redirect, name='short-link'),
+    # Не проксируется nginx: доступен только из сети контейнеров.
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
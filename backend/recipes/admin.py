@@ -1,6 +1,10 @@
 # admin.py
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 
 from .models import (
     Recipe,
@@ -11,6 +15,52 @@ from .models import (
     ShoppingCart,
     Subscribe
 )
+from .constans import ADMIN_ESTIMATED_COUNT_THRESHOLD
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+        Для больших таблиц без фильтров берет оценку количества
+        строк из статистики PostgreSQL вместо COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql' and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class '
+                    'WHERE relname = %s',
+                    [queryset.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return row[0]
+        return super().count
+
+
+class AuthorFilter(admin.SimpleListFilter):
+    """Фильтр по автору без вывода списка всех пользователей."""
+    title = 'Автор'
+    parameter_name = 'author'
+
+    def value(self):
+        value = super().value()
+        return value if value and value.isdigit() else None
+
+    def lookups(self, request, model_admin):
+        if self.value() is None:
+            return ()
+        return Client.objects.filter(
+            pk=self.value()
+        ).values_list('pk', 'username')
+
+    def queryset(self, request, queryset):
+        if self.value() is None:
+            return queryset
+        return queryset.filter(author_id=self.value())
 
 
 class CustomClientAdmin(UserAdmin):
@@ -19,8 +69,12 @@ class CustomClientAdmin(UserAdmin):
         'username',
         'first_name',
         'last_name',
-        'is_staff'
+        'is_staff',
+        'recipes_count',
+        'subscribers_count'
     )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     search_fields = (
         'email',      # Поиск по электронной почте
         'username',   # Поиск по логину
@@ -45,6 +99,7 @@ class CustomClientAdmin(UserAdmin):
         )}),
         ('Даты', {'fields': ('last_login', 'date_joined')}),
     )
+    readonly_fields = ('recipes_count', 'subscribers_count')
 
     add_fieldsets = (
         (None, {
@@ -65,28 +120,41 @@ class CustomClientAdmin(UserAdmin):
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
     search_fields = ('name',)
+    ordering = ('name',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     extra = 1
+    autocomplete_fields = ('ingredient',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ingredient')
 
 
 class RecipeAdmin(admin.ModelAdmin):
     list_display = ('name', 'get_author_name', 'favorites_count')
+    list_select_related = ('author',)
     search_fields = ('name', 'author__username')
-    list_filter = ('author',)
+    list_filter = (AuthorFilter,)
+    autocomplete_fields = ('author',)
+    readonly_fields = ('favorites_count', 'in_cart_count')
     inlines = [RecipeIngredientInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_author_name(self, obj):
-        return obj.author.username
+        return format_html(
+            '<a href="?{}={}">{}</a>',
+            AuthorFilter.parameter_name,
+            obj.author_id,
+            obj.author.username
+        )
 
     get_author_name.short_description = 'Автор'
 
-    def favorites_count(self, obj):
-        return obj.favorite.count()
-    favorites_count.short_description = 'Количество добавлений в избранное'
-
 
 class RecipeIngredientAdmin(admin.ModelAdmin):
     list_display = ('ingredient', 'amount', 'recipe')
@@ -94,14 +162,26 @@ class RecipeIngredientAdmin(admin.ModelAdmin):
 
 class ShoppingCartAdmin(admin.ModelAdmin):
     list_display = ('author', 'recipe')
+    list_select_related = ('author', 'recipe')
+    autocomplete_fields = ('author', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('author', 'recipe')
+    list_select_related = ('author', 'recipe')
+    autocomplete_fields = ('author', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 class SubscribeAdmin(admin.ModelAdmin):
     list_display = ('author', 'subscriber')
+    list_select_related = ('author', 'subscriber')
+    autocomplete_fields = ('author', 'subscriber')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 # Регистрация модели в админке
@@ -1,3 +1,47 @@
 MAX_CHAR_FIELD_LENGTH = 150
 MAX_COOKING_TIME = 600
 MAX_AMOUNT = 10000
+INGREDIENTS_BATCH_SIZE = 5000
+BACKGROUND_WORKERS = 2
+IMAGE_VARIANTS = {
+    'thumbnail': (160, 160),
+    'card': (480, 480),
+    'full': (1200, 1200),
+}
+IMAGE_VARIANTS_DIR = 'variants'
+IMAGE_VARIANT_FORMAT = 'WEBP'
+IMAGE_VARIANT_EXTENSION = 'webp'
+IMAGE_VARIANT_QUALITY = 80
+MEDIA_IMAGES_DIR = 'foodgram/images'
+MEDIA_GC_BATCH_SIZE = 1000
+MEDIA_GC_GRACE_HOURS = 24
+VERSION_RECIPES = 'recipes'
+VERSION_INGREDIENTS = 'ingredients'
+VERSION_USERS = 'users'
+VERSION_FAVORITES = 'favorites'
+VERSION_SHOPPING_CART = 'shopping_cart'
+VERSION_SUBSCRIPTIONS = 'subscriptions'
+CLIENT_REPRESENTATION_FIELDS = {
+    'email', 'username', 'first_name', 'last_name',
+    'avatar', 'avatar_variants'
+}
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+SEARCH_CONFIG = 'russian'
+FEED_FANOUT_MAX_SUBSCRIBERS = 1000
+FEED_BACKFILL_RECIPES = 100
+FEED_BATCH_SIZE = 1000
+SIMILAR_HASHES = 64
+SIMILAR_BANDS = 32
+SIMILAR_SEED = 20250101
+SIMILAR_TOP_K = 10
+SIMILAR_MIN_SCORE = 0.1
+SIMILAR_BATCH_SIZE = 1000
+SIMILAR_CANDIDATES = 50
+TRENDING_HALF_LIFE_HOURS = 72
+TRENDING_WINDOW_DAYS = 14
+TRENDING_FAVORITE_WEIGHT = 1.0
+TRENDING_CART_WEIGHT = 0.5
+TRENDING_BATCH_SIZE = 1000
+SHORT_LINK_CODE_LENGTH = 6
+SHORT_LINK_CODE_MAX_LENGTH = 16
+SHORT_LINK_ATTEMPTS = 5
@@ -0,0 +1,113 @@
+"""Денормализованные счетчики рецептов и пользователей."""
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import local
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .constans import (
+    VERSION_FAVORITES,
+    VERSION_RECIPES,
+    VERSION_SHOPPING_CART,
+    VERSION_SUBSCRIPTIONS,
+    VERSION_USERS
+)
+from .models import Client, Favorite, Recipe, ShoppingCart, Subscribe
+from .versions import bulk_changes
+
+# Связь -> (модель со счетчиком, поле связи, поле счетчика).
+COUNTERS = {
+    Favorite: (Recipe, 'recipe_id', 'favorites_count'),
+    ShoppingCart: (Recipe, 'recipe_id', 'in_cart_count'),
+    Subscribe: (Client, 'author_id', 'subscribers_count'),
+    Recipe: (Client, 'author_id', 'recipes_count'),
+}
+
+
+state = local()
+
+
+def change_counter(model, pks, field, delta):
+    """Атомарно изменяет счетчик field записей pks на delta."""
+    queryset = model.objects.filter(pk__in=pks)
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def change_counters(sender, pks, delta):
+    """
+        Изменяет счетчики записей, на которые ссылаются строки sender.
+        Внутри batched() изменения копятся и применяются в конце.
+    """
+    model, _, field = COUNTERS[sender]
+    deltas = getattr(state, 'deltas', None)
+    if deltas is None:
+        change_counter(model, pks, field, delta)
+        return
+    for pk in pks:
+        deltas[model, field][pk] += delta
+
+
+@contextmanager
+def batched():
+    """
+        Копит изменения счетчиков и применяет их по одному UPDATE
+        на каждую пару счетчик-величина изменения.
+    """
+    if getattr(state, 'deltas', None) is not None:
+        yield
+        return
+    state.deltas = defaultdict(lambda: defaultdict(int))
+    try:
+        yield
+        deltas = state.deltas
+    finally:
+        state.deltas = None
+    for (model, field), changes in deltas.items():
+        groups = defaultdict(list)
+        for pk, delta in changes.items():
+            if delta:
+                groups[delta].append(pk)
+        for delta, pks in groups.items():
+            change_counter(model, pks, field, delta)
+
+
+def count_rows(sender):
+    """Выражение: количество строк sender, ссылающихся на запись."""
+    relation = COUNTERS[sender][1].removesuffix('_id')
+    return Coalesce(
+        Subquery(
+            sender.objects.filter(
+                **{relation: OuterRef('pk')}
+            ).order_by().values(relation).annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def recount_rows(sender, pks):
+    """
+        Пересчитывает по строкам sender счетчики записей pks.
+        Нужен после bulk_create(ignore_conflicts=True): неизвестно,
+        какие строки вставлены, а какие уже добавил параллельный запрос.
+    """
+    model, _, field = COUNTERS[sender]
+    model.objects.filter(pk__in=pks).update(**{field: count_rows(sender)})
+
+
+def recount():
+    """Пересчитывает все счетчики; по одному UPDATE на счетчик."""
+    with bulk_changes(
+        VERSION_RECIPES,
+        VERSION_USERS,
+        VERSION_FAVORITES,
+        VERSION_SHOPPING_CART,
+        VERSION_SUBSCRIPTIONS
+    ):
+        for sender, (model, _, field) in COUNTERS.items():
+            model.objects.update(**{field: count_rows(sender)})
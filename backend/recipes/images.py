@@ -0,0 +1,102 @@
+"""Уменьшенные копии изображений рецептов и аватаров."""
+import io
+import os
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from .constans import (
+    IMAGE_VARIANTS,
+    IMAGE_VARIANTS_DIR,
+    IMAGE_VARIANT_EXTENSION,
+    IMAGE_VARIANT_FORMAT,
+    IMAGE_VARIANT_QUALITY
+)
+from .tasks import run_in_background
+
+variants_created = Signal()
+
+
+def variant_name(name, variant):
+    directory, filename = os.path.split(name)
+    stem, _ = os.path.splitext(filename)
+    return os.path.join(
+        directory,
+        IMAGE_VARIANTS_DIR,
+        f'{stem}_{variant}.{IMAGE_VARIANT_EXTENSION}'
+    )
+
+
+def build_variants(field_file, overwrite=False):
+    """
+        Сохраняет копии изображения всех размеров и возвращает их имена.
+        Уже существующие копии, созданные после загрузки файла,
+        используются повторно, если не передан overwrite.
+    """
+    storage = field_file.storage
+    names = {
+        variant: variant_name(field_file.name, variant)
+        for variant in IMAGE_VARIANTS
+    }
+    if not overwrite and all(
+        storage.exists(name)
+        and storage.get_modified_time(name)
+        >= storage.get_modified_time(field_file.name)
+        for name in names.values()
+    ):
+        return {'source': field_file.name, **names}
+
+    with field_file.open('rb') as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+
+        variants = {'source': field_file.name}
+        for variant, size in IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail(size, Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(
+                buffer,
+                IMAGE_VARIANT_FORMAT,
+                quality=IMAGE_VARIANT_QUALITY
+            )
+            name = names[variant]
+            if storage.exists(name):
+                storage.delete(name)
+            variants[variant] = storage.save(
+                name, ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def generate_variants(model_label, pk, field_name):
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).only(field_name).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    if not field_file:
+        return
+    updated = model.objects.filter(
+        pk=pk, **{field_name: field_file.name}
+    ).update(**{f'{field_name}_variants': build_variants(field_file)})
+    if updated:
+        variants_created.send(sender=model, pk=pk, field_name=field_name)
+
+
+def schedule_variants(instance, field_name, update_fields=None):
+    """Запускает генерацию копий, если изображение сменилось."""
+    if update_fields is not None and field_name not in update_fields:
+        return
+    field_file = getattr(instance, field_name)
+    variants = getattr(instance, f'{field_name}_variants')
+    if field_file and variants.get('source') != field_file.name:
+        run_in_background(
+            generate_variants,
+            instance._meta.label,
+            instance.pk,
+            field_name
+        )
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import build_variants, variants_created
+from recipes.models import Client, Recipe
+
+TARGETS = (
+    (Recipe, 'image'),
+    (Client, 'avatar'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает уменьшенные копии изображений рецептов и аватаров, '
+        'для которых они еще не построены.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии для всех изображений.'
+        )
+
+    def handle(self, *args, **options):
+        for model, field_name in TARGETS:
+            variants_field = f'{field_name}_variants'
+            queryset = model.objects.exclude(
+                **{field_name: ''}
+            ).exclude(
+                **{f'{field_name}__isnull': True}
+            ).only(field_name, variants_field)
+            built = failed = 0
+            for instance in queryset.iterator():
+                field_file = getattr(instance, field_name)
+                variants = getattr(instance, variants_field)
+                if (
+                    not options['force']
+                    and variants.get('source') == field_file.name
+                ):
+                    continue
+                try:
+                    variants = build_variants(field_file, options['force'])
+                except (OSError, ValueError) as error:
+                    failed += 1
+                    self.stderr.write(f'{field_file.name}: {error}')
+                    continue
+                model.objects.filter(pk=instance.pk).update(
+                    **{variants_field: variants}
+                )
+                # update() не вызывает сигналы моделей: сбрасываем
+                # кеш представлений и номера изменений так же,
+                # как после фоновой генерации копий.
+                variants_created.send(
+                    sender=model, pk=instance.pk, field_name=field_name
+                )
+                built += 1
+            self.stdout.write(self.style.SUCCESS(
+                f'{model._meta.verbose_name_plural}: создано {built}, '
+                f'ошибок {failed}.'
+            ))
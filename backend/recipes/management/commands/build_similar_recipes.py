@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import build_all
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает похожие рецепты по составу ингредиентов.'
+
+    def handle(self, *args, **options):
+        recipes, pairs = build_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рецептов: {recipes}, сохранено похожих: {pairs}.'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipes.constans import FEED_FANOUT_MAX_SUBSCRIBERS
+from recipes.models import Subscribe, TimelineEntry
+from recipes.timeline import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново заполняет ленты подписчиков последними рецептами '
+        'авторов, для которых выполняется рассылка.'
+    )
+
+    def handle(self, *args, **options):
+        # Пока транзакция не зафиксирована, читаются старые ленты;
+        # при ошибке они остаются нетронутыми.
+        with transaction.atomic():
+            TimelineEntry.objects.all().delete()
+            subscriptions = Subscribe.objects.filter(
+                author__subscribers_count__lte=FEED_FANOUT_MAX_SUBSCRIBERS
+            ).values_list('subscriber_id', 'author_id')
+            total = 0
+            for subscriber_id, author_id in subscriptions.iterator():
+                backfill(subscriber_id, author_id)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Ленты заполнены, подписок: {total}, '
+            f'записей: {TimelineEntry.objects.count()}.'
+        ))
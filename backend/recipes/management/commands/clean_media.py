@@ -0,0 +1,155 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.constans import (
+    IMAGE_VARIANTS_DIR,
+    MEDIA_GC_BATCH_SIZE,
+    MEDIA_GC_GRACE_HOURS,
+    MEDIA_IMAGES_DIR
+)
+from recipes.models import Client, MediaFile, Recipe
+from recipes.storage import content_storage
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений, на которые не ссылается ни один '
+        'рецепт или пользователь. Каталоги обходятся по одному, '
+        'ссылки проверяются пачками, поэтому память не зависит '
+        'от количества файлов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, какие файлы будут удалены.'
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=MEDIA_GC_GRACE_HOURS,
+            help='Не трогать файлы моложе указанного числа часов.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=MEDIA_GC_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+        self.deadline = time.time() - options['grace_hours'] * 3600
+        self.checked = self.orphans = self.freed = 0
+
+        root = content_storage.path(MEDIA_IMAGES_DIR)
+        if os.path.isdir(root):
+            self.walk(root, MEDIA_IMAGES_DIR)
+
+        action = 'будет удалено' if self.dry_run else 'удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {self.checked}, {action}: {self.orphans} '
+            f'({self.freed / 1024 / 1024:.1f} МБ).'
+        ))
+
+    def walk(self, path, name):
+        """
+            Обходит каталог пачками по batch_size файлов, вложенные
+            каталоги - по мере появления, копии - после исходных файлов.
+        """
+        has_variants = False
+        batch = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name == IMAGE_VARIANTS_DIR:
+                        has_variants = True
+                    else:
+                        self.walk(entry.path, f'{name}/{entry.name}')
+                elif entry.is_file(follow_symlinks=False):
+                    batch.append(entry.name)
+                    if len(batch) >= self.batch_size:
+                        self.collect(path, name, batch)
+                        batch = []
+        if batch:
+            self.collect(path, name, batch)
+        if has_variants:
+            self.collect_variants(
+                os.path.join(path, IMAGE_VARIANTS_DIR),
+                f'{name}/{IMAGE_VARIANTS_DIR}',
+                path
+            )
+
+    def collect(self, path, name, batch):
+        """Удаляет неиспользуемые файлы пачки."""
+        names = {f'{name}/{file_name}': file_name for file_name in batch}
+        referenced = set(
+            Recipe.objects.filter(image__in=names).values_list(
+                'image', flat=True
+            )
+        ) | set(
+            Client.objects.filter(avatar__in=names).values_list(
+                'avatar', flat=True
+            )
+        ) | set(
+            MediaFile.objects.filter(
+                name__in=names, references__gt=0
+            ).values_list('name', flat=True)
+        )
+        orphans = [
+            full_name for full_name, file_name in names.items()
+            if full_name not in referenced and self.expired(path, file_name)
+        ]
+        self.checked += len(batch)
+        self.remove(path, orphans)
+        if orphans and not self.dry_run:
+            MediaFile.objects.filter(name__in=orphans).delete()
+
+    def collect_variants(self, path, name, source_path):
+        """Копия жива, пока жив исходный файл с тем же хешем."""
+        batch = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                batch.append(entry.name)
+                if len(batch) >= self.batch_size:
+                    self.collect_variants_batch(path, name, source_path, batch)
+                    batch = []
+        if batch:
+            self.collect_variants_batch(path, name, source_path, batch)
+
+    def collect_variants_batch(self, path, name, source_path, batch):
+        stems = {
+            file_name: os.path.splitext(file_name)[0].rsplit('_', 1)[0]
+            for file_name in batch
+        }
+        wanted = set(stems.values())
+        alive = set()
+        # Исходные файлы ищутся повторным проходом по каталогу,
+        # чтобы не держать в памяти все его имена.
+        with os.scandir(source_path) as entries:
+            for entry in entries:
+                stem = os.path.splitext(entry.name)[0]
+                if stem in wanted and entry.is_file(follow_symlinks=False):
+                    alive.add(stem)
+        self.checked += len(batch)
+        self.remove(path, [
+            f'{name}/{file_name}'
+            for file_name, stem in stems.items()
+            if stem not in alive and self.expired(path, file_name)
+        ])
+
+    def expired(self, path, file_name):
+        return os.path.getmtime(os.path.join(path, file_name)) < self.deadline
+
+    def remove(self, path, names):
+        for full_name in names:
+            file_path = content_storage.path(full_name)
+            self.orphans += 1
+            self.freed += os.path.getsize(file_path)
+            if self.dry_run:
+                self.stdout.write(full_name)
+            else:
+                content_storage.delete(full_name)
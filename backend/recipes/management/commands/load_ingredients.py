@@ -0,0 +1,147 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from recipes.constans import (
+    INGREDIENTS_BATCH_SIZE,
+    MAX_CHAR_FIELD_LENGTH,
+    VERSION_INGREDIENTS
+)
+from recipes.models import Ingredient
+from recipes.versions import bulk_changes
+
+FORMATS = ('csv', 'json')
+CSV_HEADER = ('name', 'measurement_unit')
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает ингредиенты из CSV (name,measurement_unit) или JSON '
+        '([{"name": ..., "measurement_unit": ...}]). '
+        'Уже существующие ингредиенты пропускаются, '
+        'поэтому команду можно запускать повторно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--batch-size', type=int, default=INGREDIENTS_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загрузить CSV через COPY (только PostgreSQL).'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError(
+                f'Неизвестный формат файла: {file_format}. '
+                f'Укажите --format ({", ".join(FORMATS)}).'
+            )
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден.')
+
+        started = time.monotonic()
+        if options['copy']:
+            if file_format != 'csv' or connection.vendor != 'postgresql':
+                raise CommandError(
+                    '--copy поддерживается только для CSV и PostgreSQL.'
+                )
+            total, inserted = self.copy_csv(path)
+        else:
+            with path.open(encoding='utf-8') as file:
+                rows = (
+                    self.read_csv(file) if file_format == 'csv'
+                    else self.read_json(file)
+                )
+                total, inserted = self.bulk_insert(
+                    rows, options['batch_size']
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано строк: {total}, добавлено: {inserted}, '
+            f'пропущено: {total - inserted}, '
+            f'время: {time.monotonic() - started:.2f} с.'
+        ))
+
+    @staticmethod
+    def read_csv(file):
+        for row in csv.reader(file):
+            if tuple(row) == CSV_HEADER:
+                continue
+            yield row
+
+    @staticmethod
+    def read_json(file):
+        for item in json.load(file):
+            yield item.get('name'), item.get('measurement_unit')
+
+    @staticmethod
+    def clean(row):
+        """Возвращает (name, measurement_unit) или None для битой строки."""
+        if len(row) != 2:
+            return None
+        name, measurement_unit = (str(value or '').strip() for value in row)
+        if not name or not measurement_unit:
+            return None
+        if max(len(name), len(measurement_unit)) > MAX_CHAR_FIELD_LENGTH:
+            return None
+        return name, measurement_unit
+
+    def bulk_insert(self, rows, batch_size):
+        total = 0
+        before = Ingredient.objects.count()
+        rows = iter(rows)
+        with bulk_changes(VERSION_INGREDIENTS):
+            while batch := list(islice(rows, batch_size)):
+                total += len(batch)
+                Ingredient.objects.bulk_create(
+                    [
+                        Ingredient(name=name, measurement_unit=unit)
+                        for name, unit in filter(None, map(self.clean, batch))
+                    ],
+                    batch_size=batch_size,
+                    ignore_conflicts=True
+                )
+        return total, Ingredient.objects.count() - before
+
+    def copy_csv(self, path):
+        table = Ingredient._meta.db_table
+        with (
+            bulk_changes(VERSION_INGREDIENTS),
+            connection.cursor() as cursor
+        ):
+            cursor.execute(
+                'CREATE TEMP TABLE ingredient_import '
+                '(name text, measurement_unit text) ON COMMIT DROP'
+            )
+            with path.open(encoding='utf-8') as file:
+                cursor.copy_expert(
+                    'COPY ingredient_import (name, measurement_unit) '
+                    'FROM STDIN WITH (FORMAT csv)',
+                    file
+                )
+            cursor.execute('SELECT count(*) FROM ingredient_import')
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f'INSERT INTO {table} (name, measurement_unit) '
+                'SELECT DISTINCT trim(name), trim(measurement_unit) '
+                'FROM ingredient_import '
+                "WHERE trim(name) <> '' AND trim(measurement_unit) <> '' "
+                'AND (name, measurement_unit) <> %s '
+                f'AND length(trim(name)) <= {MAX_CHAR_FIELD_LENGTH} '
+                'AND length(trim(measurement_unit)) '
+                f'<= {MAX_CHAR_FIELD_LENGTH} '
+                'ON CONFLICT ON CONSTRAINT unique_ingredient DO NOTHING',
+                [CSV_HEADER]
+            )
+            return total, cursor.rowcount
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import recount
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает количество добавлений рецептов в избранное '
+        'и корзину, рецептов и подписчиков пользователей.'
+    )
+
+    def handle(self, *args, **options):
+        recount()
+        self.stdout.write(self.style.SUCCESS('Счетчики пересчитаны.'))
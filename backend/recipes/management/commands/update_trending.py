@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from recipes.popularity import update_trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает популярность рецептов за последнее время. '
+        'Запускается периодически, например раз в час.'
+    )
+
+    def handle(self, *args, **options):
+        total = update_trending()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлена популярность {total} рецептов.'
+        ))
@@ -0,0 +1,45 @@
+"""Учет ссылок на файлы изображений."""
+from django.db import transaction
+from django.db.models import F
+
+from .constans import IMAGE_VARIANTS
+from .images import variant_name
+from .models import MediaFile
+from .storage import content_storage
+
+
+def acquire(name):
+    """Отмечает, что на файл name ссылается еще одна запись."""
+    if not name:
+        return
+    media_file, created = MediaFile.objects.get_or_create(
+        name=name, defaults={'references': 1}
+    )
+    if not created:
+        MediaFile.objects.filter(pk=media_file.pk).update(
+            references=F('references') + 1
+        )
+
+
+def release(name):
+    """
+        Снимает ссылку на файл name.
+        Файл и его копии удаляются, когда ссылок не осталось.
+    """
+    if not name:
+        return
+    MediaFile.objects.filter(name=name, references__gt=0).update(
+        references=F('references') - 1
+    )
+    deleted, _ = MediaFile.objects.filter(name=name, references=0).delete()
+    if deleted:
+        transaction.on_commit(lambda: delete_file(name))
+
+
+def delete_file(name):
+    if MediaFile.objects.filter(name=name).exists():
+        return
+    for file_name in (
+        name, *(variant_name(name, variant) for variant in IMAGE_VARIANTS)
+    ):
+        content_storage.delete(file_name)
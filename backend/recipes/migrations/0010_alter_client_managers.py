@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:47
+
+import recipes.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_alter_shoppingcart_recipe'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='client',
+            managers=[
+                ('objects', recipes.models.ClientManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:52
+
+import recipes.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_references(apps, schema_editor):
+    MediaFile = apps.get_model('recipes', 'MediaFile')
+    references = {}
+    for model_name, field_name in (('Recipe', 'image'), ('Client', 'avatar')):
+        model = apps.get_model('recipes', model_name)
+        rows = model.objects.exclude(
+            **{f'{field_name}__isnull': True}
+        ).exclude(
+            **{field_name: ''}
+        ).values(field_name).annotate(total=Count('pk')).values_list(
+            field_name, 'total'
+        )
+        for name, total in rows.iterator():
+            references[name] = references.get(name, 0) + total
+    MediaFile.objects.bulk_create(
+        [
+            MediaFile(name=name, references=total)
+            for name, total in references.items()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_client_avatar_variants_recipe_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Путь к файлу')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='Количество ссылок')),
+            ],
+            options={
+                'verbose_name': 'Медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+            },
+        ),
+        migrations.AlterField(
+            model_name='client',
+            name='avatar',
+            field=models.ImageField(null=True, storage=recipes.storage.ContentAddressedStorage(), upload_to='foodgram/images/clients', verbose_name='Аватар'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=recipes.storage.ContentAddressedStorage(), upload_to='foodgram/images/recipes', verbose_name='Изображение рецепта'),
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-17 05:59
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    for relation_name, model_name, relation, field in (
+        ('Favorite', 'Recipe', 'recipe', 'favorites_count'),
+        ('ShoppingCart', 'Recipe', 'recipe', 'in_cart_count'),
+        ('Subscribe', 'Client', 'author', 'subscribers_count'),
+        ('Recipe', 'Client', 'author', 'recipes_count'),
+    ):
+        relation_model = apps.get_model('recipes', relation_name)
+        apps.get_model('recipes', model_name).objects.update(**{
+            field: Coalesce(
+                Subquery(
+                    relation_model.objects.filter(
+                        **{relation: OuterRef('pk')}
+                    ).order_by().values(relation).annotate(
+                        total=Count('pk')
+                    ).values('total'),
+                    output_field=IntegerField()
+                ),
+                0
+            )
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0014_tableversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='recipes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество рецептов'),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='subscribers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество подписчиков'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorites_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в избранное'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='in_cart_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество добавлений в корзину'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
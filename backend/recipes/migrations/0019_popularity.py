@@ -0,0 +1,54 @@
+# Generated by Django 5.1.6 on 2026-10-17 06:40
+
+from datetime import datetime, timezone
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backdate_existing(apps, schema_editor):
+    """
+        Время добавления старых записей неизвестно: ставим его
+        вне окна популярности, чтобы они не попали в trending.
+    """
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    for model_name in ('Favorite', 'ShoppingCart'):
+        apps.get_model('recipes', model_name).objects.update(
+            created_at=epoch
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0018_similar_recipes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='favorite',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now, verbose_name='Время добавления'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, default=django.utils.timezone.now, verbose_name='Время добавления'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backdate_existing, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='recipe',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False, verbose_name='Популярность за последнее время'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-favorites_count', '-id'], name='recipe_popular'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-trending_score', '-id'], name='recipe_trending'),
+        ),
+    ]
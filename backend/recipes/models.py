@@ -1,16 +1,84 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField
+)
 from django.core.validators import MaxValueValidator
 from django.core.exceptions import ValidationError
 
 from .constans import (
     MAX_CHAR_FIELD_LENGTH,
     MAX_COOKING_TIME,
-    MAX_AMOUNT
+    MAX_AMOUNT,
+    SEARCH_CONFIG,
+    SHORT_LINK_CODE_MAX_LENGTH
 )
+from .storage import content_storage
+
+
+class ClientQuerySet(models.QuerySet):
+
+    def with_subscription(self, user):
+        """Отмечает пользователей, на которых подписан user."""
+        if not user.is_authenticated:
+            return self.annotate(
+                is_subscribed=models.Value(
+                    False, output_field=models.BooleanField()
+                )
+            )
+        return self.annotate(
+            is_subscribed=models.Exists(
+                Subscribe.objects.filter(
+                    subscriber=user, author=models.OuterRef('pk')
+                )
+            )
+        )
+
+    def with_recipes(self, recipes_limit=None):
+        """
+            Загружает не более recipes_limit последних рецептов
+            автора одним запросом.
+        """
+        recipes = Recipe.objects.order_by('-id')
+        if recipes_limit is not None:
+            recipes = recipes[:recipes_limit]
+        return self.prefetch_related(
+            models.Prefetch(
+                'recipes',
+                queryset=recipes,
+                to_attr='limited_recipes'
+            )
+        )
+
 
+class CounterFieldsMixin:
+    """
+        Не перезаписывает счетчики при сохранении существующей записи:
+        они меняются только атомарными UPDATE (сигналы, пересчеты).
+    """
+    counter_fields = ()
 
-class Client(AbstractUser):
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class ClientManager(UserManager.from_queryset(ClientQuerySet)):
+    pass
+
+
+class Client(CounterFieldsMixin, AbstractUser):
     username = models.CharField(
         max_length=MAX_CHAR_FIELD_LENGTH,
         blank=False,
@@ -35,10 +103,27 @@ class Client(AbstractUser):
     )
     avatar = models.ImageField(
         upload_to='foodgram/images/clients',
+        storage=content_storage,
         null=True,
         blank=False,
         verbose_name='Аватар'
     )
+    avatar_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии аватара'
+    )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество рецептов'
+    )
+    subscribers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков'
+    )
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = (
         'username',
@@ -47,6 +132,10 @@ class Client(AbstractUser):
         'avatar'
     )
 
+    objects = ClientManager()
+
+    counter_fields = ('recipes_count', 'subscribers_count')
+
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
@@ -100,7 +189,68 @@ class RecipeIngredient(models.Model):
         verbose_name = 'Соответствие рецепт - ингредиент'
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+
+    def with_related(self):
+        """Загружает авторов и ингредиенты пакетными запросами."""
+        return self.select_related('author').prefetch_related(
+            models.Prefetch(
+                'recipe_ingredients',
+                queryset=RecipeIngredient.objects.select_related(
+                    'ingredient'
+                )
+            )
+        )
+
+    def with_user_flags(self, user):
+        """
+            Отмечает рецепты из избранного и списка покупок user,
+            а также рецепты авторов, на которых user подписан.
+        """
+        if not user.is_authenticated:
+            return self.annotate(
+                is_favorited=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_in_shopping_cart=models.Value(
+                    False, output_field=models.BooleanField()
+                ),
+                is_author_subscribed=models.Value(
+                    False, output_field=models.BooleanField()
+                )
+            )
+        return self.annotate(
+            is_favorited=models.Exists(
+                Favorite.objects.filter(
+                    author=user, recipe=models.OuterRef('pk')
+                )
+            ),
+            is_in_shopping_cart=models.Exists(
+                ShoppingCart.objects.filter(
+                    author=user, recipe=models.OuterRef('pk')
+                )
+            ),
+            is_author_subscribed=models.Exists(
+                Subscribe.objects.filter(
+                    subscriber=user, author=models.OuterRef('author')
+                )
+            )
+        )
+
+    def search(self, query):
+        """
+            Полнотекстовый поиск PostgreSQL по названию, ингредиентам
+            и описанию; более релевантные рецепты идут первыми.
+        """
+        search_query = SearchQuery(
+            query, config=SEARCH_CONFIG, search_type='websearch'
+        )
+        return self.filter(search_vector=search_query).annotate(
+            rank=SearchRank(models.F('search_vector'), search_query)
+        ).order_by('-rank', '-id')
+
+
+class Recipe(CounterFieldsMixin, models.Model):
     author = models.ForeignKey(
         Client,
         related_name='recipes',
@@ -114,8 +264,15 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='foodgram/images/recipes',
+        storage=content_storage,
         verbose_name='Изображение рецепта'
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии изображения'
+    )
     cooking_time = models.IntegerField(
         blank=False,
         verbose_name='Время приготовления (в мин)',
@@ -132,10 +289,46 @@ class Recipe(models.Model):
         related_name='recipes',
         verbose_name='Ингредиенты'
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество добавлений в избранное'
+    )
+    in_cart_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество добавлений в корзину'
+    )
+    trending_score = models.FloatField(
+        default=0,
+        editable=False,
+        verbose_name='Популярность за последнее время'
+    )
+    # Заполняется в PostgreSQL сигналами, индекс GIN создает миграция.
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор'
+    )
+
+    objects = RecipeQuerySet.as_manager()
+
+    counter_fields = ('favorites_count', 'in_cart_count', 'trending_score')
 
     class Meta:
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        ordering = ('-id',)
+        indexes = [
+            models.Index(
+                fields=['-favorites_count', '-id'],
+                name='recipe_popular'
+            ),
+            models.Index(
+                fields=['-trending_score', '-id'],
+                name='recipe_trending'
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -154,6 +347,11 @@ class ShoppingCart(models.Model):
         related_name='shopping_cart',
         verbose_name='Рецепт, добавленный пользователем в список покупок'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Время добавления'
+    )
 
     class Meta:
         verbose_name = 'Список покупок'
@@ -181,6 +379,11 @@ class Favorite(models.Model):
         related_name='favorite',
         verbose_name='Рецепт, добавленный пользователем в избранное'
     )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name='Время добавления'
+    )
 
     class Meta:
         verbose_name = 'Избранное'
@@ -227,3 +430,171 @@ class Subscribe(models.Model):
 
     def __str__(self):
         return f'{self.subscriber} подписан на {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """
+        Рецепт в ленте подписчика. Заполняется при публикации рецепта
+        для авторов, у которых не больше FEED_FANOUT_MAX_SUBSCRIBERS
+        подписчиков; рецепты остальных добавляются при чтении ленты.
+    """
+    subscriber = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор рецепта'
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рецепт'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['subscriber', 'recipe'],
+                name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['subscriber', 'author'],
+                name='timeline_subscriber_author'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipe} в ленте {self.subscriber}'
+
+
+class RecipeBand(models.Model):
+    """Корзина LSH: рецепты с одинаковой полосой MinHash-подписи."""
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='bands',
+        verbose_name='Рецепт'
+    )
+    band = models.PositiveSmallIntegerField(verbose_name='Номер полосы')
+    bucket = models.BigIntegerField(verbose_name='Хеш полосы')
+
+    class Meta:
+        verbose_name = 'Полоса подписи рецепта'
+        verbose_name_plural = 'Полосы подписей рецептов'
+        indexes = [
+            models.Index(
+                fields=['band', 'bucket'],
+                name='recipe_band_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipe_id}: {self.band}/{self.bucket}'
+
+
+class SimilarRecipe(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_recipes',
+        verbose_name='Рецепт'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Похожий рецепт'
+    )
+    score = models.FloatField(verbose_name='Сходство состава')
+
+    class Meta:
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipe', 'similar'],
+                name='unique_similar_recipe'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['recipe', '-score'],
+                name='similar_recipe_score'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipe_id} ~ {self.similar_id} ({self.score:.2f})'
+
+
+class ShortLink(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='short_link',
+        verbose_name='Рецепт'
+    )
+    code = models.CharField(
+        max_length=SHORT_LINK_CODE_MAX_LENGTH,
+        unique=True,
+        verbose_name='Код'
+    )
+
+    class Meta:
+        verbose_name = 'Короткая ссылка'
+        verbose_name_plural = 'Короткие ссылки'
+
+    def __str__(self):
+        return f'{self.code} -> {self.recipe_id}'
+
+
+class MediaFile(models.Model):
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Путь к файлу'
+    )
+    references = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество ссылок'
+    )
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
+
+
+class TableVersion(models.Model):
+    name = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name='Название данных'
+    )
+    version = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер изменения'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Время изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Версия данных'
+        verbose_name_plural = 'Версии данных'
+
+    def __str__(self):
+        return f'{self.name} ({self.version})'
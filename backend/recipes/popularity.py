@@ -0,0 +1,59 @@
+"""Популярность рецептов за последнее время."""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .constans import (
+    TRENDING_BATCH_SIZE,
+    TRENDING_CART_WEIGHT,
+    TRENDING_FAVORITE_WEIGHT,
+    TRENDING_HALF_LIFE_HOURS,
+    TRENDING_WINDOW_DAYS,
+    VERSION_RECIPES
+)
+from .models import Favorite, Recipe, ShoppingCart
+from .versions import bulk_changes
+
+
+def update_trending(now=None):
+    """
+        Пересчитывает trending_score по добавлениям в избранное и корзину
+        за TRENDING_WINDOW_DAYS: вес добавления уменьшается вдвое
+        каждые TRENDING_HALF_LIFE_HOURS. Добавления считаются в базе
+        по часам, поэтому строк читается не больше, чем пар рецепт-час.
+    """
+    now = now or timezone.now()
+    since = now - timedelta(days=TRENDING_WINDOW_DAYS)
+    scores = defaultdict(float)
+    for model, weight in (
+        (Favorite, TRENDING_FAVORITE_WEIGHT),
+        (ShoppingCart, TRENDING_CART_WEIGHT),
+    ):
+        for recipe_id, hour, total in model.objects.filter(
+            created_at__gte=since
+        ).annotate(hour=TruncHour('created_at')).values(
+            'recipe_id', 'hour'
+        ).annotate(total=Count('pk')).values_list(
+            'recipe_id', 'hour', 'total'
+        ).order_by().iterator():
+            age = (now - hour).total_seconds() / 3600
+            scores[recipe_id] += (
+                weight * total * 0.5 ** (age / TRENDING_HALF_LIFE_HOURS)
+            )
+
+    # bulk_update не отправляет сигналы: номер изменений рецептов
+    # увеличивается здесь, чтобы сбросить ETag списка trending.
+    with bulk_changes(VERSION_RECIPES):
+        Recipe.objects.filter(trending_score__gt=0).update(trending_score=0)
+        Recipe.objects.bulk_update(
+            [
+                Recipe(pk=recipe_id, trending_score=score)
+                for recipe_id, score in scores.items()
+            ],
+            ('trending_score',),
+            batch_size=TRENDING_BATCH_SIZE
+        )
+    return len(scores)
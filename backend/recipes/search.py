@@ -0,0 +1,59 @@
+"""Поддержка поискового вектора рецептов в PostgreSQL."""
+from threading import local
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import connections, transaction
+from django.db.models import OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+
+from .constans import SEARCH_CONFIG
+from .models import Recipe, RecipeIngredient
+
+pending = local()
+
+
+def search_vector():
+    """Название важнее ингредиентов, ингредиенты важнее описания."""
+    ingredient_names = Subquery(
+        RecipeIngredient.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            names=StringAgg('ingredient__name', ' ')
+        ).values('names'),
+        output_field=TextField()
+    )
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG)
+        + SearchVector(
+            Coalesce(ingredient_names, Value('')),
+            weight='B',
+            config=SEARCH_CONFIG
+        )
+        + SearchVector('text', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def update_search_vectors(queryset):
+    if is_supported(queryset.db):
+        queryset.update(search_vector=search_vector())
+
+
+def schedule_search_update(*pks):
+    """Пересчитывает векторы рецептов pks один раз после фиксации."""
+    if not is_supported():
+        return
+    if not hasattr(pending, 'pks'):
+        pending.pks = set()
+    pending.pks.update(pks)
+    transaction.on_commit(flush)
+
+
+def flush():
+    pks, pending.pks = pending.pks, set()
+    if pks:
+        update_search_vectors(Recipe.objects.filter(pk__in=pks))
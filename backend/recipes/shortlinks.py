@@ -0,0 +1,39 @@
+"""Короткие base62-коды для ссылок на рецепты."""
+import secrets
+import string
+
+from django.db import IntegrityError, transaction
+
+from .constans import SHORT_LINK_ATTEMPTS, SHORT_LINK_CODE_LENGTH
+from .models import ShortLink
+
+ALPHABET = string.digits + string.ascii_letters
+
+
+def generate_code(length=SHORT_LINK_CODE_LENGTH):
+    return ''.join(secrets.choice(ALPHABET) for _ in range(length))
+
+
+def get_code(recipe_id):
+    """
+        Возвращает код рецепта, при необходимости создавая его.
+        Коды случайные, чтобы по ним нельзя было перебрать рецепты;
+        при совпадении кода попытка повторяется.
+    """
+    codes = ShortLink.objects.filter(recipe_id=recipe_id)
+    code = codes.values_list('code', flat=True).first()
+    if code is not None:
+        return code
+    for attempt in range(SHORT_LINK_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return ShortLink.objects.create(
+                    recipe_id=recipe_id, code=generate_code()
+                ).code
+        except IntegrityError:
+            # Код уже создан параллельным запросом для этого же рецепта.
+            code = codes.values_list('code', flat=True).first()
+            if code is not None:
+                return code
+            if attempt == SHORT_LINK_ATTEMPTS - 1:
+                raise
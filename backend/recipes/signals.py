@@ -0,0 +1,185 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .constans import (
+    CLIENT_REPRESENTATION_FIELDS,
+    VERSION_FAVORITES,
+    VERSION_INGREDIENTS,
+    VERSION_RECIPES,
+    VERSION_SHOPPING_CART,
+    VERSION_SUBSCRIPTIONS,
+    VERSION_USERS
+)
+from .counters import COUNTERS, change_counters
+from .images import schedule_variants, variants_created
+from .media import acquire, release
+from .search import (
+    is_supported,
+    schedule_search_update,
+    update_search_vectors
+)
+from .models import (
+    Client,
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    Subscribe
+)
+from .similarity import schedule_update as schedule_similar_update
+from .tasks import run_in_background
+from .timeline import backfill, fan_out, remove
+from .versions import bump
+
+MEDIA_FIELDS = {
+    Recipe: 'image',
+    Client: 'avatar',
+}
+
+
+@receiver(post_save, sender=Recipe)
+def create_recipe_image_variants(sender, instance, update_fields, **kwargs):
+    schedule_variants(instance, 'image', update_fields)
+
+
+@receiver(post_save, sender=Client)
+def create_avatar_variants(sender, instance, update_fields, **kwargs):
+    schedule_variants(instance, 'avatar', update_fields)
+
+
+@receiver(pre_save, sender=Recipe)
+@receiver(pre_save, sender=Client)
+def remember_media_file(sender, instance, update_fields, **kwargs):
+    field_name = MEDIA_FIELDS[sender]
+    if update_fields is not None and field_name not in update_fields:
+        return
+    instance._previous_media_file = sender.objects.filter(
+        pk=instance.pk
+    ).values_list(field_name, flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Client)
+def count_media_references(sender, instance, **kwargs):
+    if '_previous_media_file' not in instance.__dict__:
+        return
+    previous = instance.__dict__.pop('_previous_media_file') or None
+    current = getattr(instance, MEDIA_FIELDS[sender]).name or None
+    if previous != current:
+        acquire(current)
+        release(previous)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Client)
+def release_media_file(sender, instance, **kwargs):
+    release(getattr(instance, MEDIA_FIELDS[sender]).name)
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+@receiver(variants_created, sender=Recipe)
+def bump_recipes_version(sender, **kwargs):
+    bump(VERSION_RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def bump_ingredients_version(sender, **kwargs):
+    bump(VERSION_INGREDIENTS, VERSION_RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Client)
+@receiver(variants_created, sender=Client)
+def bump_users_version(sender, update_fields=None, **kwargs):
+    if (
+        update_fields is not None
+        and not CLIENT_REPRESENTATION_FIELDS & set(update_fields)
+    ):
+        return
+    bump(VERSION_USERS, VERSION_RECIPES)
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+def bump_favorites_version(sender, **kwargs):
+    bump(VERSION_FAVORITES)
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def bump_shopping_cart_version(sender, **kwargs):
+    bump(VERSION_SHOPPING_CART)
+
+
+@receiver((post_save, post_delete), sender=Subscribe)
+def bump_subscriptions_version(sender, **kwargs):
+    bump(VERSION_SUBSCRIPTIONS)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_save, sender=Subscribe)
+@receiver(post_save, sender=Recipe)
+def increment_counter(sender, instance, created, **kwargs):
+    if created:
+        change_counters(
+            sender, [getattr(instance, COUNTERS[sender][1])], 1
+        )
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_delete, sender=Subscribe)
+@receiver(post_delete, sender=Recipe)
+def decrement_counter(sender, instance, **kwargs):
+    change_counters(sender, [getattr(instance, COUNTERS[sender][1])], -1)
+
+
+@receiver(post_save, sender=Recipe)
+def update_recipe_search_vector(sender, instance, update_fields, **kwargs):
+    if update_fields is not None and not {'name', 'text'} & set(
+        update_fields
+    ):
+        return
+    schedule_search_update(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def update_ingredients_search_vector(sender, instance, **kwargs):
+    schedule_search_update(instance.recipe_id)
+
+
+@receiver(post_save, sender=Ingredient)
+def update_ingredient_recipes_search_vector(sender, instance, **kwargs):
+    if is_supported():
+        transaction.on_commit(lambda: update_search_vectors(
+            Recipe.objects.filter(ingredients=instance.pk)
+        ))
+
+
+@receiver(post_save, sender=Recipe)
+def add_recipe_to_feeds(sender, instance, created, **kwargs):
+    if created:
+        run_in_background(fan_out, instance.pk)
+
+
+@receiver(post_save, sender=Subscribe)
+def add_author_to_feed(sender, instance, created, **kwargs):
+    if created:
+        run_in_background(backfill, instance.subscriber_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Subscribe)
+def remove_author_from_feed(sender, instance, **kwargs):
+    remove(instance.subscriber_id, instance.author_id)
+
+
+@receiver(post_save, sender=Recipe)
+def update_similar_recipes(sender, instance, created, **kwargs):
+    if created:
+        schedule_similar_update(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=RecipeIngredient)
+def update_similar_recipe_ingredients(sender, instance, **kwargs):
+    schedule_similar_update(instance.recipe_id)
@@ -0,0 +1,220 @@
+"""
+    Похожие рецепты по составу.
+    Наборы ингредиентов сжимаются в MinHash-подписи, полосы подписей
+    раскладываются по корзинам LSH (RecipeBand). Кандидаты из общих
+    корзин сравниваются по точному коэффициенту Жаккара, лучшие
+    сохраняются в SimilarRecipe, и запрос похожих - одна выборка.
+    Точное сходство считается только для SIMILAR_CANDIDATES
+    кандидатов с наибольшим числом общих корзин.
+"""
+import random
+from collections import Counter, defaultdict
+from heapq import nlargest
+from threading import local
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .constans import (
+    SIMILAR_BANDS,
+    SIMILAR_BATCH_SIZE,
+    SIMILAR_CANDIDATES,
+    SIMILAR_HASHES,
+    SIMILAR_MIN_SCORE,
+    SIMILAR_SEED,
+    SIMILAR_TOP_K
+)
+from .models import Recipe, RecipeBand, RecipeIngredient, SimilarRecipe
+from .tasks import run_in_background
+
+PRIME = (1 << 61) - 1
+ROWS = SIMILAR_HASHES // SIMILAR_BANDS
+BAND_FIELDS = ('recipe', 'band', 'bucket')
+SIMILAR_FIELDS = ('recipe', 'similar', 'score')
+
+_random = random.Random(SIMILAR_SEED)
+HASHES = [
+    (_random.randrange(1, PRIME), _random.randrange(PRIME))
+    for _ in range(SIMILAR_HASHES)
+]
+
+
+pending = local()
+
+
+def signature(ingredient_ids):
+    return [
+        min(
+            (a * ingredient_id + b) % PRIME
+            for ingredient_id in ingredient_ids
+        )
+        for a, b in HASHES
+    ]
+
+
+def buckets(ingredient_ids):
+    """Номер корзины для каждой полосы подписи."""
+    values = signature(ingredient_ids)
+    result = []
+    for band in range(SIMILAR_BANDS):
+        bucket = 0
+        for value in values[band * ROWS:(band + 1) * ROWS]:
+            bucket = (bucket * 1000003 + value) % PRIME
+        result.append(bucket)
+    return result
+
+
+def ingredient_sets(recipe_ids=None):
+    queryset = RecipeIngredient.objects.values_list(
+        'recipe_id', 'ingredient_id'
+    )
+    if recipe_ids is not None:
+        queryset = queryset.filter(recipe_id__in=recipe_ids)
+    sets = defaultdict(set)
+    for recipe_id, ingredient_id in queryset.iterator():
+        sets[recipe_id].add(ingredient_id)
+    return sets
+
+
+def insert_rows(model, fields, rows):
+    """
+        Вставка без создания объектов моделей: при полном пересчете
+        строк в десятки раз больше, чем рецептов.
+    """
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(model._meta.get_field(field).column)
+                  for field in fields),
+        ', '.join(['%s'] * len(fields))
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def scores(recipe_id, ingredients, collisions, sets):
+    """Пары (сходство, id) кандидатов не ниже SIMILAR_MIN_SCORE."""
+    collisions.pop(recipe_id, None)
+    for candidate, _ in collisions.most_common(SIMILAR_CANDIDATES):
+        if candidate not in sets:
+            continue
+        other = sets[candidate]
+        score = len(ingredients & other) / len(ingredients | other)
+        if score >= SIMILAR_MIN_SCORE:
+            yield score, candidate
+
+
+@transaction.atomic
+def build_all():
+    """Пересчитывает корзины и списки похожих для всех рецептов."""
+    sets = ingredient_sets()
+    RecipeBand.objects.all().delete()
+    SimilarRecipe.objects.all().delete()
+
+    recipe_buckets = {}
+    members = defaultdict(list)
+    bands = []
+    for recipe_id, ingredients in sets.items():
+        recipe_buckets[recipe_id] = buckets(ingredients)
+        for band, bucket in enumerate(recipe_buckets[recipe_id]):
+            members[band, bucket].append(recipe_id)
+            bands.append((recipe_id, band, bucket))
+        if len(bands) >= SIMILAR_BATCH_SIZE:
+            insert_rows(RecipeBand, BAND_FIELDS, bands)
+            bands = []
+    insert_rows(RecipeBand, BAND_FIELDS, bands)
+
+    similar = []
+    total = 0
+    for recipe_id, ingredients in sets.items():
+        collisions = Counter()
+        for band, bucket in enumerate(recipe_buckets[recipe_id]):
+            collisions.update(members[band, bucket])
+        for score, candidate in nlargest(
+            SIMILAR_TOP_K, scores(recipe_id, ingredients, collisions, sets)
+        ):
+            similar.append((recipe_id, candidate, score))
+        if len(similar) >= SIMILAR_BATCH_SIZE:
+            total += len(similar)
+            insert_rows(SimilarRecipe, SIMILAR_FIELDS, similar)
+            similar = []
+    total += len(similar)
+    insert_rows(SimilarRecipe, SIMILAR_FIELDS, similar)
+    return len(sets), total
+
+
+@transaction.atomic
+def update_recipe(recipe_id):
+    """
+        Обновляет корзины и похожие рецепты одного рецепта без полного
+        пересчета; рецепт добавляется и в списки своих соседей.
+    """
+    RecipeBand.objects.filter(recipe_id=recipe_id).delete()
+    SimilarRecipe.objects.filter(
+        Q(recipe_id=recipe_id) | Q(similar_id=recipe_id)
+    ).delete()
+    ingredients = ingredient_sets([recipe_id]).get(recipe_id)
+    if not ingredients or not Recipe.objects.filter(pk=recipe_id).exists():
+        return
+
+    recipe_buckets = buckets(ingredients)
+    RecipeBand.objects.bulk_create([
+        RecipeBand(recipe_id=recipe_id, band=band, bucket=bucket)
+        for band, bucket in enumerate(recipe_buckets)
+    ])
+    condition = Q()
+    for band, bucket in enumerate(recipe_buckets):
+        condition |= Q(band=band, bucket=bucket)
+    collisions = Counter(RecipeBand.objects.filter(condition).exclude(
+        recipe_id=recipe_id
+    ).values_list('recipe_id', flat=True).iterator())
+    if not collisions:
+        return
+
+    candidates = [
+        candidate
+        for candidate, _ in collisions.most_common(SIMILAR_CANDIDATES)
+    ]
+    scored = list(scores(
+        recipe_id, ingredients, collisions, ingredient_sets(candidates)
+    ))
+    SimilarRecipe.objects.bulk_create(
+        [
+            SimilarRecipe(recipe_id=recipe_id, similar_id=candidate,
+                          score=score)
+            for score, candidate in nlargest(SIMILAR_TOP_K, scored)
+        ] + [
+            SimilarRecipe(recipe_id=candidate, similar_id=recipe_id,
+                          score=score)
+            for score, candidate in scored
+        ],
+        ignore_conflicts=True
+    )
+
+    # Оставляем соседям только SIMILAR_TOP_K лучших.
+    neighbours = defaultdict(list)
+    for pk, neighbour_id, score in SimilarRecipe.objects.filter(
+        recipe_id__in=[candidate for _, candidate in scored]
+    ).values_list('pk', 'recipe_id', 'score'):
+        neighbours[neighbour_id].append((score, pk))
+    extra = [
+        pk
+        for rows in neighbours.values()
+        for _, pk in sorted(rows, reverse=True)[SIMILAR_TOP_K:]
+    ]
+    if extra:
+        SimilarRecipe.objects.filter(pk__in=extra).delete()
+
+
+def schedule_update(*recipe_ids):
+    """Пересчитывает похожие рецепты recipe_ids в фоне после фиксации."""
+    if not hasattr(pending, 'recipe_ids'):
+        pending.recipe_ids = set()
+    pending.recipe_ids.update(recipe_ids)
+    transaction.on_commit(flush)
+
+
+def flush():
+    recipe_ids, pending.recipe_ids = pending.recipe_ids, set()
+    for recipe_id in sorted(recipe_ids):
+        run_in_background(update_recipe, recipe_id)
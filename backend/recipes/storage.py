@@ -0,0 +1,53 @@
+import hashlib
+import os
+import posixpath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+from .constans import IMAGE_VARIANTS_DIR
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+        Хранилище, в котором файл называется по sha256 содержимого:
+        <каталог upload_to>/<первые 2 символа хеша>/<хеш>.<расширение>.
+        Одинаковые файлы сохраняются один раз, поэтому такие имена
+        можно кешировать навсегда.
+        Уменьшенные копии изображений уже названы по хешу оригинала
+        и сохраняются под переданным именем.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if IMAGE_VARIANTS_DIR in name.split('/'):
+            return super().save(name, content, max_length)
+
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Файл мог остаться без ссылок: обновляем время изменения,
+            # чтобы clean_media не удалил его до фиксации новой записи.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def hashed_name(name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        digest = digest.hexdigest()
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            posixpath.dirname(name), digest[:2], f'{digest}{extension}'
+        )
+
+
+content_storage = ContentAddressedStorage()
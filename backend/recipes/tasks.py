@@ -0,0 +1,28 @@
+"""Фоновое выполнение задач вне потока запроса."""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, transaction
+
+from .constans import BACKGROUND_WORKERS
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=BACKGROUND_WORKERS,
+    thread_name_prefix='foodgram-tasks'
+)
+
+
+def run_task(func, *args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', func)
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args):
+    """Ставит задачу в пул потоков после фиксации транзакции."""
+    transaction.on_commit(lambda: executor.submit(run_task, func, *args))
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from recipes.constans import IMAGE_VARIANTS
+from recipes.models import Client, Ingredient, Recipe, RecipeIngredient
+
+TEST_IMAGE = 'foodgram/images/test.png'
+
+
+class ImmediateExecutor:
+    """Выполняет фоновые задачи сразу в потоке теста."""
+
+    def submit(self, run_task, func, *args):
+        func(*args)
+
+
+# Быстрый хешер: стойкость паролей в тестах не нужна.
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+)
+class FoodgramTestCase(TestCase):
+    """
+        Фоновые задачи выполняются синхронно, а действия
+        после фиксации транзакции - по выходу из commit().
+    """
+
+    def setUp(self):
+        patcher = mock.patch('recipes.tasks.executor', ImmediateExecutor())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def commit(self):
+        return self.captureOnCommitCallbacks(execute=True)
+
+    @staticmethod
+    def create_user(username):
+        return Client.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            first_name=username,
+            last_name=username,
+            password='Password12345'
+        )
+
+    @staticmethod
+    def create_ingredients(count):
+        return Ingredient.objects.bulk_create([
+            Ingredient(name=f'ингредиент {number}', measurement_unit='г')
+            for number in range(count)
+        ])
+
+    @staticmethod
+    def create_recipe(author, name, ingredients, text='Описание'):
+        # Копии изображения считаются построенными, файл не нужен.
+        recipe = Recipe.objects.create(
+            author=author,
+            name=name,
+            text=text,
+            cooking_time=10,
+            image=TEST_IMAGE,
+            image_variants={
+                'source': TEST_IMAGE,
+                **{variant: TEST_IMAGE for variant in IMAGE_VARIANTS}
+            }
+        )
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in ingredients
+        ])
+        return recipe
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from recipes.images import variant_name
+from recipes.models import MediaFile
+from recipes.storage import content_storage
+
+from .base import FoodgramTestCase
+
+OLD = time.time() - 48 * 3600
+
+
+class CleanMediaTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    @staticmethod
+    def create_file(name, content=b'image', mtime=OLD):
+        name = content_storage.save(name, ContentFile(content))
+        os.utime(content_storage.path(name), (mtime, mtime))
+        return name
+
+    @staticmethod
+    def clean(**options):
+        call_command('clean_media', stdout=StringIO(), **options)
+
+    def test_removes_only_expired_orphans(self):
+        author = self.create_user('author')
+        referenced = self.create_file('foodgram/images/recipes/a.png', b'a')
+        counted = self.create_file('foodgram/images/recipes/b.png', b'b')
+        orphan = self.create_file('foodgram/images/recipes/c.png', b'c')
+        fresh = self.create_file(
+            'foodgram/images/recipes/d.png', b'd', mtime=time.time()
+        )
+        recipe = self.create_recipe(author, 'Суп', [])
+        recipe.image = referenced
+        recipe.save(update_fields=['image'])
+        MediaFile.objects.update_or_create(
+            name=counted, defaults={'references': 1}
+        )
+
+        self.clean(batch_size=1)
+
+        self.assertTrue(content_storage.exists(referenced))
+        self.assertTrue(content_storage.exists(counted))
+        self.assertFalse(content_storage.exists(orphan))
+        self.assertTrue(content_storage.exists(fresh))
+
+    def test_dry_run_keeps_files(self):
+        orphan = self.create_file('foodgram/images/recipes/c.png', b'c')
+
+        self.clean(dry_run=True)
+
+        self.assertTrue(content_storage.exists(orphan))
+
+    def test_removes_variants_without_source(self):
+        source = self.create_file('foodgram/images/recipes/a.png', b'a')
+        MediaFile.objects.create(name=source, references=1)
+        kept = self.create_file(variant_name(source, 'card'))
+        lost = self.create_file(
+            os.path.join(os.path.dirname(kept), 'gone_card.webp')
+        )
+
+        self.clean(batch_size=1)
+
+        self.assertTrue(content_storage.exists(kept))
+        self.assertFalse(content_storage.exists(lost))
+
+    def test_duplicate_upload_refreshes_orphan(self):
+        name = self.create_file('foodgram/images/recipes/a.png', b'a')
+
+        self.assertEqual(
+            content_storage.save(
+                'foodgram/images/recipes/b.png', ContentFile(b'a')
+            ),
+            name
+        )
+        self.clean()
+
+        self.assertTrue(content_storage.exists(name))
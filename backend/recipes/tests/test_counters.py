@@ -0,0 +1,65 @@
+from recipes.counters import change_counters, recount
+from recipes.models import Client, Favorite, Recipe, ShoppingCart, Subscribe
+from .base import FoodgramTestCase
+
+
+class CountersTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.user = self.create_user('user')
+        self.recipe = self.create_recipe(
+            self.author, 'Рецепт', self.create_ingredients(1)
+        )
+
+    def assertCounters(self, favorites=0, in_cart=0, recipes=1,
+                       subscribers=0):
+        self.recipe.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(
+            (
+                self.recipe.favorites_count,
+                self.recipe.in_cart_count,
+                self.author.recipes_count,
+                self.author.subscribers_count
+            ),
+            (favorites, in_cart, recipes, subscribers)
+        )
+
+    def test_increment_and_decrement(self):
+        self.assertCounters()
+        favorite = Favorite.objects.create(
+            author=self.user, recipe=self.recipe
+        )
+        ShoppingCart.objects.create(author=self.user, recipe=self.recipe)
+        Subscribe.objects.create(subscriber=self.user, author=self.author)
+        self.assertCounters(favorites=1, in_cart=1, subscribers=1)
+
+        favorite.delete()
+        ShoppingCart.objects.all().delete()
+        Subscribe.objects.all().delete()
+        self.assertCounters()
+
+        Recipe.objects.filter(pk=self.recipe.pk).delete()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.recipes_count, 0)
+
+    def test_counter_not_below_zero(self):
+        change_counters(Favorite, [self.recipe.pk], -1)
+        self.assertCounters()
+
+    def test_stale_instance_save_keeps_counters(self):
+        recipe = Recipe.objects.get(pk=self.recipe.pk)
+        Favorite.objects.create(author=self.user, recipe=self.recipe)
+        recipe.name = 'Новое название'
+        recipe.save()
+        self.assertCounters(favorites=1)
+        self.assertEqual(self.recipe.name, 'Новое название')
+
+    def test_recount(self):
+        Favorite.objects.create(author=self.user, recipe=self.recipe)
+        Recipe.objects.update(favorites_count=10, in_cart_count=3)
+        Client.objects.update(recipes_count=0)
+        recount()
+        self.assertCounters(favorites=1)
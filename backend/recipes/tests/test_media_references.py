@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from PIL import Image
+
+from recipes.models import MediaFile
+from recipes.storage import content_storage
+
+from .base import FoodgramTestCase
+
+
+class MediaReferencesTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.author = self.create_user('author')
+
+    @staticmethod
+    def references(name):
+        return MediaFile.objects.filter(name=name).values_list(
+            'references', flat=True
+        ).first()
+
+    def set_image(self, recipe, color):
+        content = BytesIO()
+        Image.new('RGB', (8, 8), color).save(content, 'PNG')
+        recipe.image.save(
+            'photo.png', ContentFile(content.getvalue()), save=False
+        )
+        recipe.save(update_fields=['image'])
+        return recipe.image.name
+
+    def test_same_content_is_stored_once(self):
+        first = self.create_recipe(self.author, 'Суп', [])
+        second = self.create_recipe(self.author, 'Каша', [])
+
+        name = self.set_image(first, 'red')
+
+        self.assertEqual(self.set_image(second, 'red'), name)
+        self.assertEqual(self.references(name), 2)
+
+    def test_file_removed_with_last_reference(self):
+        first = self.create_recipe(self.author, 'Суп', [])
+        second = self.create_recipe(self.author, 'Каша', [])
+        name = self.set_image(first, 'red')
+        self.set_image(second, 'red')
+
+        with self.commit():
+            first.delete()
+        self.assertEqual(self.references(name), 1)
+        self.assertTrue(content_storage.exists(name))
+
+        with self.commit():
+            self.set_image(second, 'blue')
+        self.assertIsNone(self.references(name))
+        self.assertFalse(content_storage.exists(name))
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from recipes.constans import TRENDING_WINDOW_DAYS
+from recipes.models import Favorite, Recipe, ShoppingCart
+from recipes.popularity import update_trending
+from .base import FoodgramTestCase
+
+
+class TrendingTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.users = [self.create_user(f'user{number}') for number in range(3)]
+        self.recent = self.create_recipe(self.author, 'Новый', [])
+        self.old = self.create_recipe(self.author, 'Старый', [])
+
+    def add(self, model, recipe, users, age):
+        model.objects.bulk_create([
+            model(author=user, recipe=recipe) for user in users
+        ])
+        model.objects.filter(recipe=recipe).update(
+            created_at=timezone.now() - age
+        )
+
+    def scores(self):
+        return dict(Recipe.objects.values_list('name', 'trending_score'))
+
+    def test_recent_additions_rank_higher(self):
+        self.add(Favorite, self.recent, self.users[:1], timedelta(hours=1))
+        self.add(Favorite, self.old, self.users, timedelta(days=10))
+
+        self.assertEqual(update_trending(), 2)
+
+        scores = self.scores()
+        self.assertGreater(scores['Новый'], scores['Старый'])
+
+    def test_additions_outside_window_ignored(self):
+        self.add(
+            ShoppingCart, self.old, self.users,
+            timedelta(days=TRENDING_WINDOW_DAYS + 1)
+        )
+        Recipe.objects.filter(pk=self.old.pk).update(trending_score=1)
+
+        self.assertEqual(update_trending(), 0)
+
+        self.assertEqual(self.scores()['Старый'], 0)
+
+
+class BackdateMigrationTest(TransactionTestCase):
+    """Существующие добавления не попадают в окно популярности."""
+
+    before = [('recipes', '0018_similar_recipes')]
+    after = [('recipes', '0019_popularity')]
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(
+            MigrationExecutor(connection).loader.graph.leaf_nodes()
+        )
+
+    def test_existing_rows_backdated(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        author = apps.get_model('recipes', 'Client').objects.create(
+            username='author', email='author@example.com'
+        )
+        recipe = apps.get_model('recipes', 'Recipe').objects.create(
+            author=author, name='Суп', text='Описание', cooking_time=1
+        )
+        for model_name in ('Favorite', 'ShoppingCart'):
+            apps.get_model('recipes', model_name).objects.create(
+                author=author, recipe=recipe
+            )
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+
+        since = timezone.now() - timedelta(days=TRENDING_WINDOW_DAYS)
+        for model in (Favorite, ShoppingCart):
+            self.assertFalse(
+                model.objects.filter(created_at__gte=since).exists()
+            )
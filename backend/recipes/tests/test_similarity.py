@@ -0,0 +1,58 @@
+from recipes.models import RecipeIngredient, SimilarRecipe
+from .base import FoodgramTestCase
+
+
+class SimilarRecipesTest(FoodgramTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.ingredients = self.create_ingredients(60)
+
+    def similar(self, recipe):
+        return list(SimilarRecipe.objects.filter(
+            recipe=recipe
+        ).order_by('-score').values_list('similar_id', flat=True))
+
+    def test_neighbours_after_create(self):
+        ingredients = self.ingredients
+        with self.commit():
+            first = self.create_recipe(self.author, 'A', ingredients[:6])
+            second = self.create_recipe(
+                self.author, 'B', ingredients[:5] + [ingredients[50]]
+            )
+            other = self.create_recipe(self.author, 'C', ingredients[20:26])
+        self.assertEqual(self.similar(first), [second.pk])
+        self.assertEqual(self.similar(second), [first.pk])
+        self.assertEqual(self.similar(other), [])
+        score = SimilarRecipe.objects.get(recipe=first).score
+        self.assertAlmostEqual(score, 5 / 7)
+
+    def test_neighbours_after_ingredients_edit(self):
+        ingredients = self.ingredients
+        with self.commit():
+            first = self.create_recipe(self.author, 'A', ingredients[:6])
+            other = self.create_recipe(self.author, 'C', ingredients[20:26])
+        self.assertEqual(self.similar(first), [])
+
+        with self.commit():
+            RecipeIngredient.objects.filter(recipe=other).delete()
+            RecipeIngredient.objects.create(
+                recipe=other, ingredient=ingredients[0], amount=1
+            )
+            for ingredient in ingredients[1:6]:
+                RecipeIngredient.objects.create(
+                    recipe=other, ingredient=ingredient, amount=2
+                )
+        self.assertEqual(self.similar(first), [other.pk])
+        self.assertEqual(self.similar(other), [first.pk])
+
+        with self.commit():
+            RecipeIngredient.objects.filter(
+                recipe=other, ingredient__in=ingredients[:6]
+            ).delete()
+            RecipeIngredient.objects.create(
+                recipe=other, ingredient=ingredients[40], amount=1
+            )
+        self.assertEqual(self.similar(first), [])
+        self.assertEqual(self.similar(other), [])
@@ -0,0 +1,95 @@
+"""Лента рецептов авторов, на которых подписан пользователь."""
+import heapq
+from itertools import islice
+
+from .constans import (
+    FEED_BACKFILL_RECIPES,
+    FEED_BATCH_SIZE,
+    FEED_FANOUT_MAX_SUBSCRIBERS
+)
+from .models import Client, Recipe, Subscribe, TimelineEntry
+
+
+def add_entries(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=FEED_BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def fan_out(recipe_id):
+    """Добавляет новый рецепт в ленты подписчиков автора."""
+    recipe = Recipe.objects.filter(pk=recipe_id).values(
+        'author_id', 'author__subscribers_count'
+    ).first()
+    if (
+        recipe is None
+        or recipe['author__subscribers_count'] > FEED_FANOUT_MAX_SUBSCRIBERS
+    ):
+        return
+    entries = []
+    for subscriber_id in Subscribe.objects.filter(
+        author_id=recipe['author_id']
+    ).values_list('subscriber_id', flat=True).iterator():
+        entries.append(TimelineEntry(
+            subscriber_id=subscriber_id,
+            author_id=recipe['author_id'],
+            recipe_id=recipe_id
+        ))
+        if len(entries) >= FEED_BATCH_SIZE:
+            add_entries(entries)
+            entries = []
+    add_entries(entries)
+
+
+def backfill(subscriber_id, author_id):
+    """Добавляет в ленту последние рецепты автора после подписки."""
+    if Client.objects.filter(
+        pk=author_id, subscribers_count__gt=FEED_FANOUT_MAX_SUBSCRIBERS
+    ).exists():
+        return
+    add_entries([
+        TimelineEntry(
+            subscriber_id=subscriber_id,
+            author_id=author_id,
+            recipe_id=recipe_id
+        )
+        for recipe_id in Recipe.objects.filter(
+            author_id=author_id
+        ).order_by('-id').values_list('pk', flat=True)[:FEED_BACKFILL_RECIPES]
+    ])
+
+
+def remove(subscriber_id, author_id):
+    TimelineEntry.objects.filter(
+        subscriber_id=subscriber_id, author_id=author_id
+    ).delete()
+
+
+def read_feed(user, before=None, limit=FEED_BATCH_SIZE):
+    """
+        Возвращает до limit id рецептов ленты user меньше before
+        по убыванию. Записи ленты сливаются с рецептами авторов,
+        у которых слишком много подписчиков для рассылки.
+    """
+    popular = list(Subscribe.objects.filter(
+        subscriber=user,
+        author__subscribers_count__gt=FEED_FANOUT_MAX_SUBSCRIBERS
+    ).values_list('author_id', flat=True))
+    entries = TimelineEntry.objects.filter(subscriber=user).exclude(
+        author_id__in=popular
+    )
+    if before is not None:
+        entries = entries.filter(recipe_id__lt=before)
+    streams = [
+        entries.order_by('-recipe_id').values_list(
+            'recipe_id', flat=True
+        )[:limit]
+    ]
+    if popular:
+        recipes = Recipe.objects.filter(author_id__in=popular)
+        if before is not None:
+            recipes = recipes.filter(pk__lt=before)
+        streams.append(
+            recipes.order_by('-id').values_list('pk', flat=True)[:limit]
+        )
+    return list(islice(heapq.merge(*streams, reverse=True), limit))
@@ -0,0 +1,64 @@
+"""Счетчики изменений данных для условных запросов."""
+from contextlib import contextmanager
+from threading import local
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import TableVersion
+
+
+pending = local()
+
+
+def bump(*names):
+    """
+        Увеличивает номера изменений после фиксации транзакции;
+        каждый номер меняется один раз, сколько бы строк ни изменилось.
+    """
+    if not hasattr(pending, 'names'):
+        pending.names = set()
+    pending.names.update(names)
+    transaction.on_commit(flush)
+
+
+@contextmanager
+def bulk_changes(*names):
+    """
+        Транзакция для массовых изменений в обход сигналов моделей
+        (bulk_create, bulk_update, update(), SQL): после фиксации
+        номера изменений names увеличиваются.
+    """
+    with transaction.atomic():
+        yield
+        bump(*names)
+
+
+def flush():
+    names, pending.names = pending.names, set()
+    if names:
+        increment(sorted(names))
+
+
+def increment(names):
+    for name in names:
+        updated = TableVersion.objects.filter(name=name).update(
+            version=F('version') + 1,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            TableVersion.objects.get_or_create(
+                name=name, defaults={'version': 1}
+            )
+
+
+def get_versions(*names):
+    """Возвращает номера и время последних изменений данных names."""
+    versions = {
+        name: (version, updated_at)
+        for name, version, updated_at in TableVersion.objects.filter(
+            name__in=names
+        ).values_list('name', 'version', 'updated_at')
+    }
+    return [versions.get(name, (0, None)) for name in names]